@@ -0,0 +1,125 @@
+"""
+Calibrate SRT book hours against actual work-order history.
+Streams a (possibly multi-million row) work-order CSV in chunks, keeps
+running count/mean/variance of actual hours per (model_key, code) with
+bounded memory, and writes an overlay of calibrated hours that the app
+can apply as a lookup when pricing.
+
+Work-order CSV (one row per completed operation):
+    model_key,code,actual_hours
+    excavator_CX210D,10.001.AD.10,2.7
+    ...
+
+Run:
+    python calibrate_srt_hours.py work_orders.csv --min-samples 5 --prior-weight 5
+"""
+import argparse
+import json
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable
+
+from load_srt_database import load_srt_database, write_atomic
+
+HOURS_OVERLAY_FILE = Path('srt_hours_overlay.json')
+DEFAULT_CHUNKSIZE = 500_000
+DEFAULT_MIN_SAMPLES = 5
+# Book hours count as this many samples when blending with actuals
+DEFAULT_PRIOR_WEIGHT = 5
+
+
+def _chunk_stats(chunk: pd.DataFrame) -> pd.DataFrame:
+    """count, mean and M2 (sum of squared deviations) of actual hours per key"""
+    grouped = chunk.groupby(['model_key', 'code'], sort=False)['actual_hours']
+    stats = grouped.agg(['count', 'mean', 'var'])
+    stats['m2'] = stats['var'].fillna(0.0) * (stats['count'] - 1)
+    return stats[['count', 'mean', 'm2']]
+
+
+def _merge_stats(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """Combine two sets of running statistics (Chan et al. parallel update), vectorized"""
+    a, b = a.align(b, fill_value=0.0)
+    count = a['count'] + b['count']
+    delta = b['mean'] - a['mean']
+    safe_count = count.where(count > 0, 1.0)
+    mean = a['mean'] + delta * b['count'] / safe_count
+    m2 = a['m2'] + b['m2'] + delta ** 2 * a['count'] * b['count'] / safe_count
+    return pd.DataFrame({'count': count, 'mean': mean, 'm2': m2})
+
+
+def accumulate_history(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Running statistics over all chunks; memory grows with distinct keys, not rows"""
+    totals = None
+    for chunk in chunks:
+        chunk = chunk.dropna(subset=['actual_hours'])
+        chunk = chunk[chunk['actual_hours'] > 0]
+        stats = _chunk_stats(chunk)
+        totals = stats if totals is None else _merge_stats(totals, stats)
+    return totals if totals is not None else pd.DataFrame(columns=['count', 'mean', 'm2'])
+
+
+def calibrate(stats: pd.DataFrame, book_hours: pd.Series,
+              min_samples: int = DEFAULT_MIN_SAMPLES,
+              prior_weight: float = DEFAULT_PRIOR_WEIGHT) -> pd.DataFrame:
+    """
+    Calibrated hours per (model_key, code): the mean actual hours blended
+    with book hours, which count as prior_weight samples. Keys with fewer
+    than min_samples actuals, or not in the catalog, are left out.
+    """
+    merged = stats.join(book_hours.rename('book_hours'), how='inner')
+    merged = merged[merged['count'] >= min_samples]
+    merged['calibrated_hours'] = (
+        (merged['count'] * merged['mean'] + prior_weight * merged['book_hours'])
+        / (merged['count'] + prior_weight)
+    )
+    merged['std_hours'] = (merged['m2'] / (merged['count'] - 1).clip(lower=1)) ** 0.5
+    return merged
+
+
+def overlay_from_calibration(calibrated: pd.DataFrame) -> Dict[str, Dict[str, Dict]]:
+    """{model_key: {code: {'hours', 'book_hours', 'samples', 'mean_actual', 'std_actual'}}}"""
+    overlay = {}
+    for (model_key, code), row in calibrated.iterrows():
+        overlay.setdefault(model_key, {})[code] = {
+            'hours': round(float(row['calibrated_hours']), 2),
+            'book_hours': float(row['book_hours']),
+            'samples': int(row['count']),
+            'mean_actual': round(float(row['mean']), 2),
+            'std_actual': round(float(row['std_hours']), 2)
+        }
+    return overlay
+
+
+def load_hours_overlay(path: Path = HOURS_OVERLAY_FILE) -> Dict[str, Dict[str, Dict]]:
+    """Load the calibrated-hours overlay, or an empty one if calibration has not run"""
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate SRT hours from work-order history")
+    parser.add_argument('history', type=Path, help="CSV with model_key, code and actual_hours columns")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk")
+    parser.add_argument('--min-samples', type=int, default=DEFAULT_MIN_SAMPLES)
+    parser.add_argument('--prior-weight', type=float, default=DEFAULT_PRIOR_WEIGHT)
+    parser.add_argument('--out', type=Path, default=HOURS_OVERLAY_FILE)
+    args = parser.parse_args()
+
+    df, _ = load_srt_database()
+    book_hours = df.drop_duplicates(['model_key', 'code']).set_index(['model_key', 'code'])['hours']
+    del df
+
+    chunks = pd.read_csv(
+        args.history,
+        usecols=['model_key', 'code', 'actual_hours'],
+        dtype={'model_key': str, 'code': str, 'actual_hours': float},
+        chunksize=args.chunksize
+    )
+    stats = accumulate_history(chunks)
+    calibrated = calibrate(stats, book_hours, args.min_samples, args.prior_weight)
+    overlay = overlay_from_calibration(calibrated)
+
+    write_atomic(args.out, json.dumps(overlay).encode('utf-8'))
+    print(f"✓ Calibrated {len(calibrated):,} codes from {int(stats['count'].sum()):,} work orders -> {args.out}")
@@ -0,0 +1,116 @@
+"""
+Background export jobs for the Streamlit app.
+Large exports (multi-sheet Excel workbooks for fleet quotes, zipped
+per-machine CSVs) are built on a per-process thread pool instead of the
+script thread. Each job is a dict the worker updates with its status and
+progress; the session keeps its jobs in session state, polls them and offers
+the finished bytes for download.
+"""
+import io
+import itertools
+import re
+import threading
+import time
+import zipfile
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+# Exports built at the same time, per server process
+MAX_CONCURRENT_EXPORTS = 2
+# Exports running or waiting, per server process; more are refused
+MAX_PENDING_EXPORTS = 8
+
+_job_ids = itertools.count(1)
+_INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+
+def new_export_queue(max_workers: int = MAX_CONCURRENT_EXPORTS, max_pending: int = MAX_PENDING_EXPORTS) -> Dict:
+    """Thread pool plus the slots that cap running and queued jobs"""
+    return {
+        'pool': ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export'),
+        'slots': threading.BoundedSemaphore(max_pending)
+    }
+
+
+def submit_export(queue: Dict, name: str, file_name: str, mime: str,
+                  build: Callable[[Callable[[float, str], None]], bytes]) -> Dict:
+    """
+    Queue build(report) -> bytes, where report(fraction, message) updates the
+    job's progress. Returns the job dict; raises RuntimeError when the process
+    already has MAX_PENDING_EXPORTS jobs.
+    """
+    if not queue['slots'].acquire(blocking=False):
+        raise RuntimeError("The server is busy with other exports; try again in a moment")
+
+    job = {
+        'id': next(_job_ids),
+        'name': name,
+        'file_name': file_name,
+        'mime': mime,
+        'status': 'queued',
+        'progress': 0.0,
+        'message': "Waiting for a free worker",
+        'data': None,
+        'error': None,
+        'seconds': None
+    }
+
+    def report(fraction: float, message: str):
+        job['progress'] = min(max(fraction, 0.0), 1.0)
+        job['message'] = message
+
+    def run():
+        start = time.perf_counter()
+        job['status'] = 'running'
+        try:
+            job['data'] = build(report)
+            report(1.0, "Ready")
+            job['status'] = 'done'
+        except Exception as e:
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['seconds'] = time.perf_counter() - start
+            queue['slots'].release()
+
+    queue['pool'].submit(run)
+    return job
+
+
+def _sheet_name(name: str, used: set) -> str:
+    """Valid, unique Excel sheet name (31 characters, no []:*?/\\)"""
+    base = _INVALID_SHEET_CHARS.sub('-', name)[:31] or "Sheet"
+    sheet = base
+    for n in itertools.count(2):
+        if sheet not in used:
+            break
+        sheet = f"{base[:31 - len(str(n)) - 1]}~{n}"
+    used.add(sheet)
+    return sheet
+
+
+def excel_workbook(sheets: Dict[str, pd.DataFrame]) -> Callable:
+    """Build function writing one workbook sheet per entry"""
+    def build(report: Callable[[float, str], None]) -> bytes:
+        output = io.BytesIO()
+        used = set()
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            for i, (name, df) in enumerate(sheets.items()):
+                report(i / (len(sheets) + 1), f"Writing sheet {name}")
+                df.to_excel(writer, sheet_name=_sheet_name(name, used), index=False)
+            report(len(sheets) / (len(sheets) + 1), "Saving workbook")
+        return output.getvalue()
+    return build
+
+
+def zipped_csvs(files: Dict[str, pd.DataFrame]) -> Callable:
+    """Build function zipping one CSV per entry (keys are file names)"""
+    def build(report: Callable[[float, str], None]) -> bytes:
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for i, (file_name, df) in enumerate(files.items()):
+                report(i / len(files), f"Adding {file_name}")
+                archive.writestr(file_name, df.to_csv(index=False))
+        return output.getvalue()
+    return build
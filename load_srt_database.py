@@ -2,11 +2,67 @@
 Universal SRT database loader - works with both JSON and pickle formats
 Drop this into your Streamlit app directory
 """
+import argparse
+import bisect
+import gc
+import hashlib
+import heapq
+import io
 import json
+import os
 import pickle
+import re
+import threading
+import time
+import zlib
+import numpy as np
 import pandas as pd
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Preferred SRT source file
+SRT_JSON_FILE = Path('srt_database_organized.json')
+
+# Directory scanned for catalog delta files (see apply_pending_deltas)
+CATALOG_DELTA_DIR = Path('srt_deltas')
+
+# Optional service kit definitions (see load_service_kits)
+SERVICE_KITS_FILE = Path('service_kits.json')
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic GC while bulk-building (or unpickling) acyclic containers"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def _parse_model_key(model_key: str) -> Tuple[str, str]:
+    """Split a model key like 'excavator_CX210D' into (equipment_type, model_name)"""
+    parts = model_key.split('_')
+    equipment_type = parts[0].replace('_', ' ').title()
+    model_name = '_'.join(parts[1:]) if len(parts) > 1 else parts[0]
+    return equipment_type, model_name
+
+def _model_info(model_key: str, num_codes: int) -> Dict:
+    """Build the model_lookup entry for a model key"""
+    equipment_type, model_name = _parse_model_key(model_key)
+    return {
+        'display_name': f"{equipment_type} {model_name}",
+        'equipment_type': equipment_type,
+        'model_name': model_name,
+        'num_codes': num_codes
+    }
 
 def load_srt_database() -> Tuple[pd.DataFrame, Dict]:
     """
@@ -15,7 +71,7 @@ def load_srt_database() -> Tuple[pd.DataFrame, Dict]:
     """
     
     # Try JSON first (preferred)
-    json_file = Path('srt_database_organized.json')
+    json_file = SRT_JSON_FILE
     if json_file.exists():
         print("Loading from JSON...")
         with open(json_file, 'r') as f:
@@ -26,18 +82,9 @@ def load_srt_database() -> Tuple[pd.DataFrame, Dict]:
         model_lookup = {}
         
         for model_key, codes in srt_data.items():
-            # Parse the model key
-            parts = model_key.split('_')
-            equipment_type = parts[0].replace('_', ' ').title()
-            model_name = '_'.join(parts[1:]) if len(parts) > 1 else parts[0]
-            
-            # Add to model lookup
-            model_lookup[model_key] = {
-                'display_name': f"{equipment_type} {model_name}",
-                'equipment_type': equipment_type,
-                'model_name': model_name,
-                'num_codes': len(codes)
-            }
+            # Parse the model key and add to model lookup
+            equipment_type, model_name = _parse_model_key(model_key)
+            model_lookup[model_key] = _model_info(model_key, len(codes))
             
             # Add all codes to flat list
             for code in codes:
@@ -106,9 +153,1140 @@ def get_model_codes(df: pd.DataFrame, model_key: str) -> pd.DataFrame:
     """Get all SRT codes for a specific model"""
     return df[df['model_key'] == model_key].copy()
 
+# ============================================================================
+# DATA VALIDATION
+# ============================================================================
 
-# Example usage in Streamlit:
-if __name__ == "__main__":
+VALIDATION_REPORT_COLUMNS = ['issue', 'model_key', 'code', 'description', 'hours']
+
+def validate_catalog_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Data-quality checks over the flat SRT table, each one a single vectorized
+    pass. Returns one report row per problem (a row can fail several checks).
+    """
+    hours = pd.to_numeric(df['hours'], errors='coerce')
+    model_keys = df['model_key'].astype(str)
+    checks = {
+        "Duplicate code for model": df.duplicated(['model_key', 'code'], keep=False),
+        "Zero or negative hours": ~(hours > 0),
+        "Empty description": df['description'].fillna('').astype(str).str.strip() == '',
+        "Model key has no '_'": ~model_keys.str.contains('_', regex=False)
+    }
+
+    problems = [
+        df.loc[mask, VALIDATION_REPORT_COLUMNS[1:]].assign(issue=issue)
+        for issue, mask in checks.items() if mask.any()
+    ]
+    if not problems:
+        return pd.DataFrame(columns=VALIDATION_REPORT_COLUMNS)
+    return pd.concat(problems, ignore_index=True)[VALIDATION_REPORT_COLUMNS]
+
+def _new_validation_state() -> Dict:
+    return {'done': threading.Event(), 'report': None, 'summary': {}, 'csv': b'',
+            'rows': 0, 'seconds': None, 'error': None}
+
+def _fill_validation_state(state: Dict, df: pd.DataFrame):
+    start = time.perf_counter()
+    try:
+        report = validate_catalog_df(df)
+        state['rows'] = len(df)
+        state['report'] = report
+        state['summary'] = {issue: int(count) for issue, count in report['issue'].value_counts(sort=False).items()}
+        state['csv'] = report.to_csv(index=False).encode('utf-8')
+    except Exception as e:
+        state['error'] = str(e)
+    finally:
+        state['seconds'] = time.perf_counter() - start
+        state['done'].set()
+
+def start_catalog_validation(df: pd.DataFrame) -> Dict:
+    """
+    Validate an already-loaded SRT table on a background thread so startup is
+    not blocked. Returns a state dict filled in when the thread finishes
+    ('done' is set): report, summary ({issue: count}), csv (report bytes),
+    rows, seconds, error. Delta files are checked separately when applied
+    (validate_catalog_delta); prebuilt snapshots carry their report instead
+    (load_validation_snapshot).
+    """
+    state = _new_validation_state()
+    threading.Thread(target=_fill_validation_state, args=(state, df), name='srt-validation', daemon=True).start()
+    return state
+
+# ============================================================================
+# IN-MEMORY CATALOG
+# ============================================================================
+#
+# The catalog bundles everything the app derives from the SRT data:
+#   model_lookup  - model_key -> display/type info (same shape as above)
+#   codes         - model_key -> {code: operation} (source of truth, and the
+#                   (model_key, code) -> operation hash index); operations are
+#                   {'code', 'preview', 'hours', 'description_ref'}
+#   descriptions  - model_key -> compressed full descriptions (see operation_description)
+#   database      - model_key -> [operation, ...] (per-model groups, catalog order)
+#   search_index  - model_key -> {token: set of codes}
+#   sorted_tokens - model_key -> sorted index tokens (prefix lookups by binary search)
+#   completions   - model_key -> autocomplete dictionary of description words
+#                   (see build_completions)
+#   hours_index   - model_key -> operations sorted by hours (for range queries)
+#   sections      - model_key -> {code section: set of codes} (facet counts)
+#   model_stats   - model_key -> operation count, book hours total/mean/percentiles
+#                   and operations per code section (see _model_stats)
+#   type_counts   - equipment type -> number of operations (facet counts)
+#   equipment_types        - sorted equipment types
+#   display_names_by_type  - equipment type -> sorted model display names
+#   model_key_by_display   - display name -> model_key (O(1) model selection)
+#   kits          - model_key -> [resolved service kit, ...] with stored base hours
+# Deltas update these per touched model/code, so applying one costs time
+# proportional to the size of the change rather than the whole catalog.
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens used by the search index"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def _operation_tokens(op: Dict) -> set:
+    """Tokens an operation is indexed under (description words and code segments)"""
+    tokens = set(tokenize(op['description']))
+    tokens.update(tokenize(op['code']))
+    tokens.add(op['code'].lower())
+    return tokens
+
+def _index_operation(index: Dict[str, set], op: Dict, owned: set = None):
+    """
+    Add op's code to its tokens' postings. With owned (copy-on-write), postings
+    sets not yet in owned are shared with readers and get copied first.
+    """
+    for token in _operation_tokens(op):
+        if owned is None or token in owned:
+            index.setdefault(token, set()).add(op['code'])
+        else:
+            index[token] = index.get(token, set()) | {op['code']}
+            owned.add(token)
+
+def _unindex_operation(index: Dict[str, set], op: Dict, owned: set = None):
+    for token in _operation_tokens(op):
+        postings = index.get(token)
+        if postings is None:
+            continue
+        if owned is not None and token not in owned:
+            postings = index[token] = set(postings)
+            owned.add(token)
+        postings.discard(op['code'])
+        if not postings:
+            del index[token]
+
+# ----------------------------------------------------------------------------
+# Autocomplete suggests description words only: code segments and whole codes
+# would crowd out the vocabulary for digit prefixes. Each model keeps its
+# words' document frequencies, the words sorted, and the top completions of
+# every prefix up to COMPLETION_PREFIX_LEN characters; longer prefixes cover
+# few enough words to rank on the fly.
+# ----------------------------------------------------------------------------
+
+# Completions offered per keystroke
+AUTOCOMPLETE_LIMIT = 6
+COMPLETION_PREFIX_LEN = 3
+
+def _rank_terms(terms: Dict[str, int], candidates, limit: int = AUTOCOMPLETE_LIMIT) -> List[Tuple[str, int]]:
+    """Most frequent candidates first, equally frequent ones alphabetically"""
+    return [(term, terms[term]) for term in heapq.nsmallest(limit, candidates, key=lambda t: (-terms[t], t))]
+
+def _prefix_range(sorted_terms: List[str], prefix: str) -> List[str]:
+    lo = bisect.bisect_left(sorted_terms, prefix)
+    return sorted_terms[lo:bisect.bisect_left(sorted_terms, prefix + '\uffff', lo)]
+
+def build_completions(terms: Dict[str, int]) -> Dict:
+    """Completion dictionary from {description word: operations using it}"""
+    sorted_terms = sorted(terms)
+    by_prefix = {}
+    for term in sorted_terms:
+        for n in range(1, min(len(term), COMPLETION_PREFIX_LEN) + 1):
+            by_prefix.setdefault(term[:n], []).append(term)
+    return {
+        'terms': terms,
+        'sorted_terms': sorted_terms,
+        'top': {prefix: _rank_terms(terms, candidates) for prefix, candidates in by_prefix.items()}
+    }
+
+def _update_completions(previous: Dict, changes: Counter) -> Dict:
+    """New completion dictionary with document frequencies changed by changes"""
+    terms = dict(previous['terms'])
+    sorted_terms = list(previous['sorted_terms'])
+    top = dict(previous['top'])
+    for term, change in changes.items():
+        if not change:
+            continue
+        count = terms.get(term, 0) + change
+        if count and term not in terms:
+            bisect.insort(sorted_terms, term)
+        elif not count:
+            del sorted_terms[bisect.bisect_left(sorted_terms, term)]
+        if count:
+            terms[term] = count
+        else:
+            del terms[term]
+    
+    prefixes = {term[:n] for term in changes for n in range(1, min(len(term), COMPLETION_PREFIX_LEN) + 1)}
+    for prefix in prefixes:
+        ranked = _rank_terms(terms, _prefix_range(sorted_terms, prefix))
+        if ranked:
+            top[prefix] = ranked
+        else:
+            top.pop(prefix, None)
+    return {'terms': terms, 'sorted_terms': sorted_terms, 'top': top}
+
+# ----------------------------------------------------------------------------
+# Descriptions are most of the catalog's bytes but lists only show the first
+# 80 characters. Operations keep that preview uncompressed; longer full texts
+# go into zlib blocks per model, compressed against a preset dictionary of the
+# model's frequent words, and are only inflated for quote lines and exports.
+# ----------------------------------------------------------------------------
+
+DESCRIPTION_PREVIEW_CHARS = 80
+DESCRIPTION_BLOCK_SIZE = 32
+DESCRIPTION_DICT_BYTES = 4096
+
+def _description_dictionary(descriptions: List[str]) -> bytes:
+    """zlib preset dictionary of a model's most frequent words (most valuable last)"""
+    counts = Counter(word for text in descriptions for word in text.split())
+    chosen = []
+    size = 0
+    for word in sorted(counts, key=lambda w: counts[w] * len(w), reverse=True):
+        size += len(word.encode('utf-8')) + 1
+        if size > DESCRIPTION_DICT_BYTES:
+            break
+        chosen.append(word)
+    return ' '.join(reversed(chosen)).encode('utf-8')
+
+def _compress_block(texts: List[str], zdict: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=zdict)
+    return compressor.compress('\0'.join(texts).encode('utf-8')) + compressor.flush()
+
+@lru_cache(maxsize=256)
+def _inflate_block(block: bytes, zdict: bytes) -> Tuple[str, ...]:
+    decompressor = zlib.decompressobj(-15, zdict=zdict)
+    return tuple((decompressor.decompress(block) + decompressor.flush()).decode('utf-8').split('\0'))
+
+def _pack_operations(ops: List[Dict], store: Dict) -> List[Dict]:
+    """
+    Compact operations for raw {'code', 'description', 'hours'} ones. Full
+    descriptions longer than the preview are appended to store['blocks'].
+    """
+    blocks = store['blocks']
+    packed = []
+    pending = []
+    for op in ops:
+        description = op['description']
+        ref = None
+        if len(description) > DESCRIPTION_PREVIEW_CHARS:
+            ref = len(blocks) * DESCRIPTION_BLOCK_SIZE + len(pending)
+            pending.append(description.replace('\0', ''))
+        packed.append({
+            'code': op['code'],
+            'preview': description[:DESCRIPTION_PREVIEW_CHARS],
+            'hours': op['hours'],
+            'description_ref': ref
+        })
+    
+    # Refs above assume full blocks, so cut pending at the same boundaries
+    for start in range(0, len(pending), DESCRIPTION_BLOCK_SIZE):
+        blocks.append(_compress_block(pending[start:start + DESCRIPTION_BLOCK_SIZE], store['dict']))
+    return packed
+
+def operation_description(catalog: Dict, model_key: str, op: Dict) -> str:
+    """Full description of a catalog operation, inflated from its block if needed"""
+    ref = op['description_ref']
+    if ref is None:
+        return op['preview']
+    store = catalog['descriptions'][model_key]
+    return _inflate_block(store['blocks'][ref // DESCRIPTION_BLOCK_SIZE], store['dict'])[ref % DESCRIPTION_BLOCK_SIZE]
+
+def _raw_operation(catalog: Dict, model_key: str, op: Dict) -> Dict:
+    return {'code': op['code'], 'description': operation_description(catalog, model_key, op), 'hours': op['hours']}
+
+def _code_section(code: str) -> str:
+    """Code section facet, i.e. the first segment of '10.001.AD.10'"""
+    return code.split('.', 1)[0]
+
+# Book-hour percentiles kept per model
+MODEL_STATS_PERCENTILES = [25, 50, 75, 90]
+
+def _sorted_percentiles(sorted_hours: List[float]) -> Dict[int, float]:
+    """MODEL_STATS_PERCENTILES read off already sorted hours (linear interpolation, like np.percentile)"""
+    n = len(sorted_hours)
+    percentiles = {}
+    for pct in MODEL_STATS_PERCENTILES:
+        if not n:
+            percentiles[pct] = 0.0
+            continue
+        position = (n - 1) * pct / 100
+        lo = int(position)
+        hi = min(lo + 1, n - 1)
+        percentiles[pct] = float(sorted_hours[lo] + (sorted_hours[hi] - sorted_hours[lo]) * (position - lo))
+    return percentiles
+
+def _model_stats(sorted_hours: List[float], sections: Dict[str, set], total_hours: float = None) -> Dict:
+    """
+    Per-model aggregates, from the already sorted hours and the section sets.
+    Deltas pass the running total_hours, so nothing here walks the operations.
+    """
+    n = len(sorted_hours)
+    if total_hours is None:
+        total_hours = float(np.asarray(sorted_hours, dtype=float).sum())
+    return {
+        'operations': n,
+        'total_hours': total_hours,
+        'mean_hours': total_hours / n if n else 0.0,
+        'min_hours': float(sorted_hours[0]) if n else 0.0,
+        'max_hours': float(sorted_hours[-1]) if n else 0.0,
+        'percentiles': _sorted_percentiles(sorted_hours),
+        'sections': {section: len(codes) for section, codes in sorted(sections.items())}
+    }
+
+def _sorted_indexes(codes: Dict[str, Dict]) -> Dict:
+    """Hours-sorted operations, code-section sets and statistics for one model"""
+    ops_by_hours = sorted(codes.values(), key=lambda op: op['hours'])
+    hours = [op['hours'] for op in ops_by_hours]
+    sections = {}
+    for code in codes:
+        sections.setdefault(_code_section(code), set()).add(code)
+    return {
+        'hours_index': {'hours': hours, 'operations': ops_by_hours},
+        'sections': sections,
+        'model_stats': _model_stats(hours, sections)
+    }
+
+def _own_section(sections: Dict[str, set], section: str, owned: set) -> set:
+    """A section's code set that is safe to modify (copied once if shared with readers)"""
+    if section not in owned:
+        sections[section] = set(sections.get(section, ()))
+        owned.add(section)
+    return sections.setdefault(section, set())
+
+def _update_sorted_indexes(previous: Dict, removed: List[Dict], added: List[Dict]) -> Dict:
+    """
+    _sorted_indexes after removing and adding operations, edited into copies
+    of the previous hours index, sections and totals by binary search instead
+    of re-sorting the model. removed must be the operation objects indexed.
+    """
+    hours = list(previous['hours_index']['hours'])
+    ops_by_hours = list(previous['hours_index']['operations'])
+    sections = dict(previous['sections'])
+    owned = set()
+    total_hours = previous['model_stats']['total_hours']
+    
+    for op in removed:
+        i = bisect.bisect_left(hours, op['hours'])
+        while ops_by_hours[i] is not op:
+            i += 1
+        del hours[i], ops_by_hours[i]
+        section = _code_section(op['code'])
+        codes = _own_section(sections, section, owned)
+        codes.discard(op['code'])
+        if not codes:
+            del sections[section]
+        total_hours -= op['hours']
+    for op in added:
+        i = bisect.bisect_right(hours, op['hours'])
+        hours.insert(i, op['hours'])
+        ops_by_hours.insert(i, op)
+        _own_section(sections, _code_section(op['code']), owned).add(op['code'])
+        total_hours += op['hours']
+    
+    return {
+        'hours_index': {'hours': hours, 'operations': ops_by_hours},
+        'sections': sections,
+        'model_stats': _model_stats(hours, sections, total_hours if hours else 0.0)
+    }
+
+def compile_model(model_key: str, ops: List[Dict], search_index: Dict = None) -> Dict:
+    """
+    Build one model's code map, search index, completions, hours index and
+    sections. Pass a previously persisted search_index ({'postings',
+    'sorted_tokens', 'completions'}) to skip tokenizing. Self-contained and picklable so `build` can run it
+    in worker processes.
+    """
+    raw = {}
+    index = {}
+    terms = Counter()
+    for op in ops:
+        op = {'code': op['code'], 'description': op['description'], 'hours': float(op['hours'])}
+        raw[op['code']] = op
+        if search_index is None:
+            _index_operation(index, op)
+            terms.update(set(tokenize(op['description'])))
+    
+    if search_index is not None:
+        index, sorted_tokens = search_index['postings'], search_index['sorted_tokens']
+        completions = search_index['completions']
+    else:
+        sorted_tokens = sorted(index)
+        completions = build_completions(dict(terms))
+    
+    descriptions = {'dict': _description_dictionary([op['description'] for op in raw.values()]), 'blocks': []}
+    codes = {op['code']: op for op in _pack_operations(list(raw.values()), descriptions)}
+    return {'codes': codes, 'descriptions': descriptions, 'search_index': index, 'sorted_tokens': sorted_tokens,
+            'completions': completions, **_sorted_indexes(codes)}
+
+def _publish_model(catalog: Dict, model_key: str, compiled: Dict):
+    """Store a compiled model and refresh its per-model groups and facet counts"""
+    codes = compiled['codes']
+    previous_count = catalog['model_lookup'].get(model_key, {}).get('num_codes', 0)
+    info = _model_info(model_key, len(codes))
+    type_counts = catalog['type_counts']
+    type_counts[info['equipment_type']] = type_counts.get(info['equipment_type'], 0) + len(codes) - previous_count
+    
+    # Blocks first: readers holding a new operation must find its block
+    catalog['descriptions'][model_key] = compiled['descriptions']
+    catalog['codes'][model_key] = codes
+    catalog['search_index'][model_key] = compiled['search_index']
+    catalog['sorted_tokens'][model_key] = compiled['sorted_tokens']
+    catalog['completions'][model_key] = compiled['completions']
+    catalog['database'][model_key] = list(codes.values())
+    catalog['hours_index'][model_key] = compiled['hours_index']
+    catalog['sections'][model_key] = compiled['sections']
+    catalog['model_stats'][model_key] = compiled['model_stats']
+    catalog['model_lookup'][model_key] = info
+
+def _set_model_operations(catalog: Dict, model_key: str, ops: List[Dict]):
+    """(Re)build every derived structure for one model"""
+    _publish_model(catalog, model_key, compile_model(model_key, ops))
+
+def _drop_model(catalog: Dict, model_key: str):
+    if model_key in catalog['model_lookup']:
+        info = catalog['model_lookup'][model_key]
+        catalog['type_counts'][info['equipment_type']] -= info['num_codes']
+        if not catalog['type_counts'][info['equipment_type']]:
+            del catalog['type_counts'][info['equipment_type']]
+        _remove_model_grouping(catalog, model_key)
+    for key in ('codes', 'descriptions', 'search_index', 'sorted_tokens', 'completions', 'database', 'hours_index',
+                'sections', 'model_stats', 'model_lookup', 'kits'):
+        catalog[key].pop(model_key, None)
+
+def _add_model_grouping(catalog: Dict, model_key: str):
+    """Insert a model into the sorted type/display groupings (copy-on-write)"""
+    info = catalog['model_lookup'][model_key]
+    eq_type = info['equipment_type']
+    
+    if eq_type not in catalog['display_names_by_type']:
+        types = list(catalog['equipment_types'])
+        bisect.insort(types, eq_type)
+        catalog['equipment_types'] = types
+    names = list(catalog['display_names_by_type'].get(eq_type, []))
+    bisect.insort(names, info['display_name'])
+    catalog['display_names_by_type'][eq_type] = names
+    catalog['model_key_by_display'][info['display_name']] = model_key
+
+def _remove_model_grouping(catalog: Dict, model_key: str):
+    """Remove a model from the sorted type/display groupings (copy-on-write)"""
+    info = catalog['model_lookup'][model_key]
+    eq_type = info['equipment_type']
+    
+    names = [name for name in catalog['display_names_by_type'][eq_type] if name != info['display_name']]
+    if names:
+        catalog['display_names_by_type'][eq_type] = names
+    else:
+        del catalog['display_names_by_type'][eq_type]
+        catalog['equipment_types'] = [t for t in catalog['equipment_types'] if t != eq_type]
+    catalog['model_key_by_display'].pop(info['display_name'], None)
+
+def load_service_kits(path: Path = SERVICE_KITS_FILE) -> List[Dict]:
+    """
+    Load service kit definitions, if present. Each kit applies to one model
+    or to every model of an equipment type:
+    
+        [
+          {"name": "500-Hour Service", "equipment_type": "Excavator", "codes": ["...", ...]},
+          {"name": "1,000-Hour Service", "model_key": "excavator_CX210D", "codes": ["...", ...]}
+        ]
+    """
+    if not path.exists():
+        return []
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _resolve_model_kits(catalog: Dict, model_key: str):
+    """Resolve every kit that applies to a model and store it with its base-hour total"""
+    info = catalog['model_lookup'][model_key]
+    kits = []
+    for kit in catalog['kit_definitions']:
+        if kit.get('model_key', model_key) != model_key:
+            continue
+        if kit.get('equipment_type', info['equipment_type']) != info['equipment_type']:
+            continue
+        ops, missing = resolve_codes(catalog, model_key, kit['codes'])
+        if ops:
+            kits.append({
+                'name': kit['name'],
+                'operations': ops,
+                'base_hours': sum(op['hours'] for op in ops),
+                'missing_codes': missing
+            })
+    
+    if kits:
+        catalog['kits'][model_key] = kits
+    else:
+        catalog['kits'].pop(model_key, None)
+
+def group_operations(df: pd.DataFrame) -> Dict[str, List[Dict]]:
+    """Per-model operation lists from the loader DataFrame, in one pass over its columns"""
+    groups = {}
+    for model_key, code, description, hours in zip(
+        df['model_key'].tolist(), df['code'].tolist(), df['description'].tolist(), df['hours'].tolist()
+    ):
+        groups.setdefault(model_key, []).append({'code': code, 'description': description, 'hours': hours})
+    return groups
+
+def _runtime_state() -> Dict:
+    """Per-process catalog entries: the delta lock and which delta files were handled"""
+    return {
+        'seen_delta_files': set(),
+        'pending_deltas': {},
+        'rejected_delta_files': {},
+        'lock': threading.RLock()
+    }
+
+def _new_catalog(kit_definitions: List[Dict] = None) -> Dict:
+    return {
+        'version': 0,
+        'applied_deltas': [],
+        'model_lookup': {},
+        'codes': {},
+        'descriptions': {},
+        'database': {},
+        'search_index': {},
+        'sorted_tokens': {},
+        'completions': {},
+        'hours_index': {},
+        'sections': {},
+        'model_stats': {},
+        'type_counts': {},
+        'equipment_types': [],
+        'display_names_by_type': {},
+        'model_key_by_display': {},
+        'kit_definitions': kit_definitions or [],
+        'kits': {},
+        **_runtime_state()
+    }
+
+def assemble_catalog(compiled_models: Dict[str, Dict], kit_definitions: List[Dict] = None) -> Dict:
+    """Build the catalog from compiled models (see compile_model), in model_lookup order"""
+    catalog = _new_catalog(kit_definitions)
+    for model_key, compiled in compiled_models.items():
+        _publish_model(catalog, model_key, compiled)
+    
+    # Sort the type and display groupings once instead of on every rerun
+    by_type = get_models_by_type(catalog['model_lookup'])
+    catalog['equipment_types'] = sorted(by_type)
+    catalog['display_names_by_type'] = {
+        eq_type: sorted(catalog['model_lookup'][mk]['display_name'] for mk in model_keys)
+        for eq_type, model_keys in by_type.items()
+    }
+    catalog['model_key_by_display'] = {
+        info['display_name']: model_key for model_key, info in catalog['model_lookup'].items()
+    }
+    
+    for model_key in catalog['model_lookup']:
+        _resolve_model_kits(catalog, model_key)
+    
+    return catalog
+
+def build_catalog(df: pd.DataFrame, model_lookup: Dict, kit_definitions: List[Dict] = None,
+                  index_cache: Path = None) -> Dict:
+    """
+    Build the in-memory catalog from the loader output in one grouped pass.
+    With index_cache, search indexes persisted for the same catalog content
+    are reused, and rebuilt (and saved) when missing or stale.
+    """
+    with _gc_paused():
+        groups = group_operations(df)
+    
+        cached_indexes = None
+        if index_cache is not None:
+            content_hash = catalog_content_hash(df)
+            cached_indexes = load_search_index_cache(index_cache, content_hash)
+    
+        catalog = assemble_catalog(
+            {
+                model_key: compile_model(
+                    model_key, groups.get(model_key, []),
+                    cached_indexes.get(model_key) if cached_indexes is not None else None
+                )
+                for model_key in model_lookup
+            },
+            kit_definitions
+        )
+    
+    if index_cache is not None and cached_indexes is None:
+        save_search_index_cache(catalog, index_cache, content_hash)
+    return catalog
+
+# ============================================================================
+# PERSISTED SEARCH INDEXES
+# ============================================================================
+#
+# st.cache_data/st.cache_resource live in process memory, so every restart
+# would re-tokenize the whole catalog. The token postings and sorted token
+# lists (and completion dictionaries) are saved next to the data, keyed by a hash of the catalog content
+# and a format version, and reloaded on the next start if both still match.
+
+SEARCH_INDEX_CACHE_FILE = Path('srt_search_index.pkl')
+SEARCH_INDEX_FORMAT_VERSION = 2
+
+def catalog_content_hash(df: pd.DataFrame) -> str:
+    """Hash of the indexed catalog content (model, code, description), vectorized"""
+    row_hashes = pd.util.hash_pandas_object(df[['model_key', 'code', 'description']], index=False)
+    return hashlib.sha256(row_hashes.values.tobytes()).hexdigest()
+
+def load_search_index_cache(path: Path, content_hash: str):
+    """Persisted {model_key: {'postings', 'sorted_tokens', 'completions'}}, or None if missing or stale"""
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f, _gc_paused():
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if cached.get('format_version') != SEARCH_INDEX_FORMAT_VERSION or cached.get('content_hash') != content_hash:
+        return None
+    return cached['models']
+
+def save_search_index_cache(catalog: Dict, path: Path, content_hash: str):
+    """Persist the catalog's search indexes for the next process start"""
+    cached = {
+        'format_version': SEARCH_INDEX_FORMAT_VERSION,
+        'content_hash': content_hash,
+        'models': {
+            model_key: {
+                'postings': index,
+                'sorted_tokens': catalog['sorted_tokens'][model_key],
+                'completions': catalog['completions'][model_key]
+            }
+            for model_key, index in catalog['search_index'].items()
+        }
+    }
+    try:
+        write_atomic(path, pickle.dumps(cached, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError as e:
+        # A read-only deployment just rebuilds on every start
+        print(f"⚠️ Could not save search index cache: {e}")
+
+def catalog_num_codes(catalog: Dict) -> int:
+    """Total number of SRT codes across all models"""
+    return sum(info['num_codes'] for info in catalog['model_lookup'].values())
+
+# A reader can fetch a model's index and token list either side of a delta
+# being published, so a listed token may be missing from the index
+_NO_POSTINGS = frozenset()
+
+def _matching_codes(catalog: Dict, model_key: str, query: str):
+    """Codes whose description words or code segments prefix-match every query word"""
+    words = tokenize(query)
+    if not words:
+        # Punctuation only: nothing can match
+        return set()
+    index = catalog['search_index'][model_key]
+    tokens = catalog['sorted_tokens'][model_key]
+    matches = None
+    for word in words:
+        # Tokens starting with word form a contiguous range of the sorted list
+        postings = set()
+        i = bisect.bisect_left(tokens, word)
+        while i < len(tokens) and tokens[i].startswith(word):
+            postings |= index.get(tokens[i], _NO_POSTINGS)
+            i += 1
+        matches = postings if matches is None else matches & postings
+        if not matches:
+            break
+    return matches
+
+def complete_terms(catalog: Dict, model_key: str, prefix: str,
+                   limit: int = AUTOCOMPLETE_LIMIT) -> List[Tuple[str, int]]:
+    """
+    Description words of a model starting with prefix, as (word, document
+    frequency), most frequent first. Short prefixes are answered from the
+    precomputed top completions; longer ones rank their (few) words by
+    binary search over the sorted vocabulary.
+    """
+    prefix = prefix.lower()
+    if not prefix:
+        return []
+    completions = catalog['completions'][model_key]
+    if len(prefix) <= COMPLETION_PREFIX_LEN and limit <= AUTOCOMPLETE_LIMIT:
+        return completions['top'].get(prefix, [])[:limit]
+    return _rank_terms(completions['terms'], _prefix_range(completions['sorted_terms'], prefix), limit)
+
+def get_hours_bounds(catalog: Dict, model_key: str) -> Tuple[float, float]:
+    """Smallest and largest labor hours for a model"""
+    hours = catalog['hours_index'][model_key]['hours']
+    return (hours[0], hours[-1]) if hours else (0.0, 0.0)
+
+def get_section_counts(catalog: Dict, model_key: str) -> Dict[str, int]:
+    """Operations per code section for a model, sorted by section"""
+    return catalog['model_stats'][model_key]['sections']
+
+def catalog_total_hours(catalog: Dict) -> float:
+    """Book hours across the whole catalog, summed from the per-model statistics"""
+    return sum(stats['total_hours'] for stats in catalog['model_stats'].values())
+
+def search_model_operations(catalog: Dict, model_key: str, query: str,
+                            hours_range: Tuple[float, float] = None, section: str = None) -> List[Dict]:
+    """
+    Filter a model's operations through its indexes.
+    Every query word must prefix-match a description word or code segment,
+    hours_range is answered by binary search over the hours-sorted operations,
+    and section narrows to one code section. With an hours range the result
+    is ordered by hours, otherwise in catalog order.
+    """
+    candidates = _matching_codes(catalog, model_key, query) if query and query.strip() else None
+    if section is not None:
+        section_codes = catalog['sections'][model_key].get(section, set())
+        candidates = section_codes if candidates is None else candidates & section_codes
+    
+    if hours_range is not None:
+        hours_index = catalog['hours_index'][model_key]
+        lo = bisect.bisect_left(hours_index['hours'], hours_range[0])
+        hi = bisect.bisect_right(hours_index['hours'], hours_range[1])
+        operations = hours_index['operations'][lo:hi]
+    else:
+        operations = catalog['database'][model_key]
+    
+    if candidates is None:
+        return operations
+    return [op for op in operations if op['code'] in candidates]
+
+_CODE_LIST_SEPARATORS = re.compile(r'[\s,;]+')
+
+def parse_code_list(text: str) -> List[str]:
+    """Split pasted text (newlines, commas, semicolons, spaces) into unique codes, in order"""
+    return list(dict.fromkeys(code for code in _CODE_LIST_SEPARATORS.split(text.strip()) if code))
+
+def resolve_codes(catalog: Dict, model_key: str, codes: List[str]) -> Tuple[List[Dict], List[str]]:
+    """
+    Resolve codes against a model through the (model_key, code) hash index.
+    Returns (matched operations, unknown codes).
+    """
+    model_codes = catalog['codes'].get(model_key, {})
+    matched, unknown = [], []
+    for code in codes:
+        op = model_codes.get(code)
+        if op is None:
+            unknown.append(code)
+        else:
+            matched.append(op)
+    return matched, unknown
+
+class QuoteLine(NamedTuple):
+    """
+    Compact quote line kept in session state: a reference into the shared
+    catalog plus optional per-line overrides (e.g. hours). Manual entries
+    have no model_key and carry their own description/hours/model overrides.
+    """
+    model_key: Optional[str]
+    code: str
+    overrides: Optional[Dict] = None
+
+def resolve_quote_line(catalog: Dict, line: QuoteLine, hours_overlay: Dict = None) -> Dict:
+    """
+    Display fields (code, description, hours, model) for a quote line, resolved
+    from the catalog. With hours_overlay ({model_key: {code: {'hours': ...}}},
+    see calibrate_srt_hours.py), calibrated hours replace book hours and the
+    book value is kept as 'book_hours'.
+    """
+    if line.model_key is None:
+        resolved = {'code': line.code, 'description': '', 'hours': 0.0, 'model': ''}
+    else:
+        info = catalog['model_lookup'].get(line.model_key)
+        model = info['display_name'] if info else line.model_key
+        op = catalog['codes'].get(line.model_key, {}).get(line.code)
+        if op is None:
+            # Removed by a catalog delta since it was added
+            resolved = {'code': line.code, 'description': '⚠️ No longer in the SRT catalog', 'hours': 0.0, 'model': model}
+        else:
+            resolved = {'code': op['code'], 'description': operation_description(catalog, line.model_key, op),
+                        'hours': op['hours'], 'model': model}
+            calibrated = hours_overlay.get(line.model_key, {}).get(line.code) if hours_overlay else None
+            if calibrated is not None:
+                resolved['book_hours'] = op['hours']
+                resolved['hours'] = calibrated['hours']
+    
+    if line.overrides:
+        resolved.update(line.overrides)
+    return resolved
+
+def quote_line_hours(catalog: Dict, line: QuoteLine, hours_overlay: Dict = None) -> float:
+    """Hours resolve_quote_line would give a line, without building the rest (or inflating its description)"""
+    if line.overrides and 'hours' in line.overrides:
+        return line.overrides['hours']
+    op = catalog['codes'].get(line.model_key, {}).get(line.code) if line.model_key is not None else None
+    if op is None:
+        return 0.0
+    calibrated = hours_overlay.get(line.model_key, {}).get(line.code) if hours_overlay else None
+    return calibrated['hours'] if calibrated is not None else op['hours']
+
+# ============================================================================
+# CATALOG DELTAS
+# ============================================================================
+#
+# A delta file describes one catalog revision:
+#
+#   {
+#     "version": 3,                 # new catalog version
+#     "base_version": 2,            # version the delta applies on top of
+#     "added_models":   {"excavator_CX350D": [{"code", "description", "hours"}, ...]},
+#     "removed_models": ["loader_721F"],
+#     "upsert_codes":   {"excavator_CX210D": [{"code", "description", "hours"}, ...]},
+#     "removed_codes":  {"excavator_CX210D": ["10.001.AD.10"]}
+#   }
+#
+# Deltas are applied in version order; the base JSON is version 0.
+
+def _validate_operation(model_key: str, op: Dict):
+    if not isinstance(op, dict):
+        raise ValueError(f"{model_key}: operation entries must be objects")
+    for field in ('code', 'description', 'hours'):
+        if field not in op:
+            raise ValueError(f"{model_key}: operation is missing '{field}'")
+    if not isinstance(op['code'], str) or not op['code']:
+        raise ValueError(f"{model_key}: operation code must be a non-empty string")
+    if not isinstance(op['description'], str):
+        raise ValueError(f"{model_key}/{op['code']}: description must be a string")
+    try:
+        float(op['hours'])
+    except (TypeError, ValueError):
+        raise ValueError(f"{model_key}/{op['code']}: hours must be numeric")
+
+def _check_delta_shape(delta):
+    """Types of the delta's fields; raises ValueError for anything apply could trip over"""
+    if not isinstance(delta, dict):
+        raise ValueError("Delta must be a JSON object")
+    for field in ('version', 'base_version'):
+        if not isinstance(delta.get(field), int) or isinstance(delta.get(field), bool):
+            raise ValueError(f"Delta is missing integer '{field}'")
+    if not isinstance(delta.get('removed_models', []), list) or \
+            not all(isinstance(model_key, str) for model_key in delta.get('removed_models', [])):
+        raise ValueError("removed_models must be a list of model keys")
+    for section in ('added_models', 'upsert_codes', 'removed_codes'):
+        entries = delta.get(section, {})
+        if not isinstance(entries, dict) or not all(isinstance(items, list) for items in entries.values()):
+            raise ValueError(f"{section} must map model keys to lists")
+    for model_key, codes in delta.get('removed_codes', {}).items():
+        if not all(isinstance(code, str) for code in codes):
+            raise ValueError(f"removed_codes: {model_key} must list code strings")
+
+def validate_catalog_delta(catalog: Dict, delta: Dict):
+    """Check a delta against the current catalog; raises ValueError if it cannot apply"""
+    _check_delta_shape(delta)
+    if delta['base_version'] != catalog['version']:
+        raise ValueError(
+            f"Delta v{delta['version']} expects catalog v{delta['base_version']}, "
+            f"but the loaded catalog is v{catalog['version']}"
+        )
+    if delta['version'] <= delta['base_version']:
+        raise ValueError(f"Delta version {delta['version']} must be greater than its base version")
+    
+    added = delta.get('added_models', {})
+    removed = set(delta.get('removed_models', []))
+    for model_key, ops in added.items():
+        if model_key in catalog['model_lookup'] and model_key not in removed:
+            raise ValueError(f"Model '{model_key}' already exists")
+        for op in ops:
+            _validate_operation(model_key, op)
+    for model_key in removed:
+        if model_key not in catalog['model_lookup']:
+            raise ValueError(f"Cannot remove unknown model '{model_key}'")
+    
+    for section in ('upsert_codes', 'removed_codes'):
+        for model_key in delta.get(section, {}):
+            if model_key not in catalog['model_lookup'] or model_key in removed:
+                raise ValueError(f"{section}: unknown model '{model_key}'")
+    for model_key, ops in delta.get('upsert_codes', {}).items():
+        for op in ops:
+            _validate_operation(model_key, op)
+        repeated = sorted(code for code, count in Counter(op['code'] for op in ops).items() if count > 1)
+        if repeated:
+            raise ValueError(f"upsert_codes: {model_key} lists codes more than once {repeated}")
+    for model_key, codes in delta.get('removed_codes', {}).items():
+        missing = [code for code in codes if code not in catalog['codes'][model_key]]
+        if missing:
+            raise ValueError(f"removed_codes: {model_key} has no codes {missing}")
+
+def apply_catalog_delta(catalog: Dict, delta: Dict) -> Dict:
+    """
+    Validate and apply a delta to the catalog in place.
+    Only the models and codes named in the delta are touched.
+    Returns a summary of what changed.
+    """
+    with catalog['lock']:
+        validate_catalog_delta(catalog, delta)
+        
+        for model_key in delta.get('removed_models', []):
+            _drop_model(catalog, model_key)
+        for model_key, ops in delta.get('added_models', {}).items():
+            _set_model_operations(catalog, model_key, ops)
+            _add_model_grouping(catalog, model_key)
+        
+        touched = set(delta.get('upsert_codes', {})) | set(delta.get('removed_codes', {}))
+        for model_key in touched:
+            # Readers may hold the published index, so edit copies: the token
+            # dict is copied here and each postings set the first time it changes
+            codes = dict(catalog['codes'][model_key])
+            previous_index = catalog['search_index'][model_key]
+            index = dict(previous_index)
+            owned = set()
+            
+            replaced = []
+            term_changes = Counter()
+            for code in delta.get('removed_codes', {}).get(model_key, []):
+                replaced.append(codes.pop(code))
+                raw = _raw_operation(catalog, model_key, replaced[-1])
+                _unindex_operation(index, raw, owned)
+                term_changes.subtract(set(tokenize(raw['description'])))
+            upserts = {}
+            for op in delta.get('upsert_codes', {}).get(model_key, []):
+                op = {'code': op['code'], 'description': op['description'], 'hours': float(op['hours'])}
+                if op['code'] in codes:
+                    replaced.append(codes[op['code']])
+                    raw = _raw_operation(catalog, model_key, replaced[-1])
+                    _unindex_operation(index, raw, owned)
+                    term_changes.subtract(set(tokenize(raw['description'])))
+                upserts[op['code']] = op
+                _index_operation(index, op, owned)
+                term_changes.update(set(tokenize(op['description'])))
+            
+            # Only tokens whose postings changed can enter or leave the sorted list
+            sorted_tokens = list(catalog['sorted_tokens'][model_key])
+            for token in owned:
+                if token in previous_index and token not in index:
+                    del sorted_tokens[bisect.bisect_left(sorted_tokens, token)]
+                elif token in index and token not in previous_index:
+                    bisect.insort(sorted_tokens, token)
+            
+            # Upserted descriptions go into new blocks; existing refs stay valid
+            store = catalog['descriptions'][model_key]
+            descriptions = {'dict': store['dict'], 'blocks': list(store['blocks'])}
+            added = _pack_operations(list(upserts.values()), descriptions)
+            for op in added:
+                codes[op['code']] = op
+            
+            # Publish the new containers; readers keep whichever version they fetched
+            previous = {key: catalog[key][model_key] for key in ('hours_index', 'sections', 'model_stats')}
+            _publish_model(catalog, model_key, {
+                'codes': codes,
+                'descriptions': descriptions,
+                'search_index': index,
+                'sorted_tokens': sorted_tokens,
+                'completions': _update_completions(catalog['completions'][model_key], term_changes),
+                **_update_sorted_indexes(previous, replaced, added)
+            })
+        
+        # Kits hold references to operations, so re-resolve them for changed models
+        for model_key in touched | set(delta.get('added_models', {})):
+            _resolve_model_kits(catalog, model_key)
+        
+        summary = {
+            'version': delta['version'],
+            'added_models': len(delta.get('added_models', {})),
+            'removed_models': len(delta.get('removed_models', [])),
+            'upserted_codes': sum(len(ops) for ops in delta.get('upsert_codes', {}).values()),
+            'removed_codes': sum(len(codes) for codes in delta.get('removed_codes', {}).values())
+        }
+        catalog['version'] = delta['version']
+        catalog['applied_deltas'].append(summary)
+        return summary
+
+def load_catalog_delta(path: Path) -> Dict:
+    """Read a delta file from disk"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _read_delta_file(path: Path) -> Dict:
+    """Parse and shape-check a delta file; raises ValueError if it can never apply"""
+    try:
+        delta = load_catalog_delta(path)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"cannot read delta file ({e})")
+    _check_delta_shape(delta)
+    return delta
+
+def apply_pending_deltas(catalog: Dict, delta_dir: Path = CATALOG_DELTA_DIR) -> Tuple[List[Dict], Dict[str, str]]:
+    """
+    Apply every new delta file in delta_dir newer than the catalog version,
+    in version order. Returns (summaries of applied deltas, {file name: reason}
+    for files rejected by this call).
+
+    Each file is read once. Files that cannot apply (unreadable, malformed,
+    conflicting with the catalog) are rejected and reported once; a file whose
+    base version is ahead of the catalog waits, parsed, for the deltas before it.
+    """
+    if not delta_dir.is_dir():
+        return [], {}
+    
+    with catalog['lock']:
+        pending = catalog['pending_deltas']
+        rejected = {}
+        for path in delta_dir.glob('*.json'):
+            name = path.name
+            if name in catalog['seen_delta_files'] or name in pending or name in catalog['rejected_delta_files']:
+                continue
+            try:
+                pending[name] = _read_delta_file(path)
+            except ValueError as e:
+                rejected[name] = str(e)
+        
+        applied = []
+        for name, delta in sorted(pending.items(), key=lambda item: item[1]['version']):
+            if delta['base_version'] > catalog['version']:
+                continue
+            del pending[name]
+            if delta['version'] <= catalog['version']:
+                catalog['seen_delta_files'].add(name)
+                continue
+            try:
+                applied.append(apply_catalog_delta(catalog, delta))
+                catalog['seen_delta_files'].add(name)
+            except ValueError as e:
+                rejected[name] = str(e)
+        
+        catalog['rejected_delta_files'].update(rejected)
+        return applied, rejected
+
+
+# ============================================================================
+# PREBUILT CATALOG SNAPSHOTS
+# ============================================================================
+#
+# `python load_srt_database.py build` compiles the catalog ahead of time
+# (per-model work on a process pool) and writes a pickle snapshot plus a
+# JSON manifest. Deployments ship the snapshot and the app only opens it.
+
+CATALOG_SNAPSHOT_FILE = Path('srt_catalog.pkl')
+CATALOG_MANIFEST_FILE = Path('srt_catalog_manifest.json')
+CATALOG_VALIDATION_FILE = Path('srt_validation_report.csv')
+CATALOG_FORMAT_VERSION = 5
+
+# Catalog entries that only make sense inside a running process
+_RUNTIME_KEYS = tuple(_runtime_state())
+
+def _source_signature(path: Path) -> Dict:
+    """Cheap identity of the source JSON, used to detect a stale snapshot"""
+    stat = path.stat()
+    return {'name': path.name, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+def write_atomic(path: Path, data: bytes):
+    """Write a file so readers see either the old or the new content, never a partial one"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _compile_model_item(item: Tuple[str, List[Dict]]) -> Tuple[str, Dict]:
+    model_key, ops = item
+    return model_key, compile_model(model_key, ops)
+
+def compile_catalog(df: pd.DataFrame, model_lookup: Dict, kit_definitions: List[Dict] = None,
+                    workers: int = None) -> Dict:
+    """Build the catalog with per-model compilation spread across a process pool"""
+    groups = group_operations(df)
+    items = [(model_key, groups.get(model_key, [])) for model_key in model_lookup]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(items) // (workers * 4))
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        compiled = dict(pool.map(_compile_model_item, items, chunksize=chunksize))
+    
+    # pool.map preserves input order, so the catalog keeps model_lookup order
+    return assemble_catalog(compiled, kit_definitions)
+
+def build_catalog_artifacts(out_dir: Path = Path('.'), workers: int = None) -> Dict:
+    """Compile the catalog snapshot and manifest into out_dir; returns the manifest"""
+    start = time.perf_counter()
+    df, model_lookup = load_srt_database()
+    catalog = compile_catalog(df, model_lookup, load_service_kits(), workers)
+    validation = _new_validation_state()
+    _fill_validation_state(validation, df)
+    if validation['error']:
+        raise ValueError(f"Catalog validation failed: {validation['error']}")
+    
+    snapshot = {key: value for key, value in catalog.items() if key not in _RUNTIME_KEYS}
+    manifest = {
+        'format_version': CATALOG_FORMAT_VERSION,
+        'source': _source_signature(SRT_JSON_FILE) if SRT_JSON_FILE.exists() else None,
+        'models': len(catalog['model_lookup']),
+        'codes': catalog_num_codes(catalog),
+        'validation': {'rows': validation['rows'], 'issues': validation['summary'],
+                       'seconds': round(validation['seconds'], 3)},
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'build_seconds': round(time.perf_counter() - start, 3)
+    }
+    
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_atomic(out_dir / CATALOG_SNAPSHOT_FILE.name, pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+    write_atomic(out_dir / CATALOG_VALIDATION_FILE.name, validation['csv'])
+    write_atomic(out_dir / CATALOG_MANIFEST_FILE.name, json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+def load_catalog_snapshot(snapshot_file: Path = CATALOG_SNAPSHOT_FILE,
+                          manifest_file: Path = CATALOG_MANIFEST_FILE):
+    """
+    Open a prebuilt catalog snapshot. Returns None when there is none, it was
+    built by another format version, or the source JSON has changed since.
+    """
+    if not (snapshot_file.exists() and manifest_file.exists()):
+        return None
+    with open(manifest_file, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != CATALOG_FORMAT_VERSION:
+        return None
+    if SRT_JSON_FILE.exists() and manifest.get('source') != _source_signature(SRT_JSON_FILE):
+        return None
+    
+    with open(snapshot_file, 'rb') as f, _gc_paused():
+        catalog = pickle.load(f)
+    catalog.update(_runtime_state())
+    print(f"✓ Opened prebuilt catalog with {manifest['models']} models and {manifest['codes']} SRT codes")
+    return catalog
+
+def load_validation_snapshot(report_file: Path = CATALOG_VALIDATION_FILE,
+                             manifest_file: Path = CATALOG_MANIFEST_FILE) -> Optional[Dict]:
+    """
+    The validation report written by `build`, as a finished state dict like
+    start_catalog_validation's. None for snapshots built without one.
+    """
+    if not (report_file.exists() and manifest_file.exists()):
+        return None
+    with open(manifest_file, 'r') as f:
+        summary = json.load(f).get('validation')
+    if summary is None:
+        return None
+    
+    state = _new_validation_state()
+    state['csv'] = report_file.read_bytes()
+    state['report'] = pd.read_csv(io.BytesIO(state['csv']), dtype=str)
+    state['summary'] = summary['issues']
+    state['rows'] = summary['rows']
+    state['seconds'] = summary['seconds']
+    state['done'].set()
+    return state
+
+def load_catalog(validate: bool = False) -> Tuple[Dict, Optional[Dict]]:
+    """
+    The catalog every front end serves: the prebuilt snapshot when it is
+    current, otherwise built from the JSON with service kits and the persisted
+    search indexes. Returns (catalog, validation state); with validate, the
+    snapshot's report or a background validation of the loaded table, else None.
+    """
+    catalog = load_catalog_snapshot()
+    if catalog is not None:
+        return catalog, load_validation_snapshot() if validate else None
+    
+    df, models = load_srt_database()
+    validation = start_catalog_validation(df) if validate else None
+    return build_catalog(df, models, load_service_kits(), index_cache=SEARCH_INDEX_CACHE_FILE), validation
+
+def _print_summary():
+    """Example usage: load the database and print a short summary"""
     # Load database
     df, models = load_srt_database()
     
@@ -123,3 +1301,21 @@ if __name__ == "__main__":
     engine_codes = search_srt_codes(df, "engine")
     print(f"  Found {len(engine_codes)} codes")
     print(engine_codes[['model_name', 'code', 'description', 'hours']].head(3))
+
+
+# Example usage in Streamlit:
+#   python load_srt_database.py          print a summary of the database
+#   python load_srt_database.py build    compile the catalog snapshot ahead of time
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SRT database tools")
+    subcommands = parser.add_subparsers(dest='command')
+    build_parser = subcommands.add_parser('build', help="Compile the catalog snapshot ahead of time")
+    build_parser.add_argument('--out', type=Path, default=Path('.'), help="Output directory")
+    build_parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    
+    if args.command == 'build':
+        manifest = build_catalog_artifacts(out_dir=args.out, workers=args.workers)
+        print(f"✓ Built catalog snapshot in {manifest['build_seconds']}s -> {args.out}")
+    else:
+        _print_summary()
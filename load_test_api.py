@@ -0,0 +1,116 @@
+"""
+Load test for srt_api_server.py.
+Opens keep-alive connections, replays a mix of search, model listing and
+quote pricing requests, and reports p50/p99 latency and requests per second.
+
+Run (with the server already running):
+    python load_test_api.py --connections 20 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+
+async def _send(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                method: str, path: str, body: Dict = None) -> Tuple[int, Dict]:
+    data = json.dumps(body).encode('utf-8') if body is not None else b''
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode('latin-1')
+        + data
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+def _request_mix(models: List[str], sample_codes: List[Tuple[str, str]]):
+    """Yield an endless mix of realistic requests"""
+    terms = ['engine', 'hydraulic', 'replace', 'pump', 'filter', 'seal', 'transmission']
+    while True:
+        roll = random.random()
+        if roll < 0.5:
+            yield 'GET', f"/search?model_key={random.choice(models)}&q={random.choice(terms)}&limit=20", None
+        elif roll < 0.6:
+            yield 'GET', f"/search?q={random.choice(terms)}&limit=10", None
+        elif roll < 0.65:
+            yield 'GET', "/models", None
+        elif roll < 0.9:
+            lines = [{'model_key': mk, 'code': code} for mk, code in random.sample(sample_codes, min(20, len(sample_codes)))]
+            yield 'POST', "/quote", {'lines': lines, 'factors': {'age': "9-12 years (Average)"}}
+        else:
+            yield 'POST', "/batch", {'requests': [
+                {'method': 'GET', 'path': f"/search?model_key={random.choice(models)}&q={random.choice(terms)}"}
+                for _ in range(5)
+            ]}
+
+
+async def _client(host: str, port: int, count: int, requests, latencies: List[float], errors: List[int]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            method, path, body = next(requests)
+            start = time.perf_counter()
+            status, _ = await _send(reader, writer, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load_test(host: str, port: int, connections: int, requests_per_connection: int) -> Dict:
+    # Discover models and some real codes to quote against
+    reader, writer = await asyncio.open_connection(host, port)
+    _, listing = await _send(reader, writer, 'GET', '/models')
+    models = list(listing['models'])
+    sample_codes = []
+    for mk in random.sample(models, min(10, len(models))):
+        _, found = await _send(reader, writer, 'GET', f"/search?model_key={mk}&limit=20")
+        sample_codes.extend((mk, op['code']) for op in found['results'])
+    writer.close()
+
+    requests = _request_mix(models, sample_codes)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, requests_per_connection, requests, latencies, errors)
+        for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p99_ms': quantiles[98] * 1000
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the SRT API service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--connections', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=500, help="Requests per connection")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args.host, args.port, args.connections, args.requests))
+    print(f"Requests:   {report['requests']:,} ({report['errors']} errors) in {report['seconds']:.2f}s")
+    print(f"Throughput: {report['rps']:,.0f} req/s")
+    print(f"Latency:    p50 {report['p50_ms']:.2f} ms | p99 {report['p99_ms']:.2f} ms")
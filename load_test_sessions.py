@@ -0,0 +1,237 @@
+"""
+Concurrent-session load test for the Streamlit app.
+Starts `streamlit run streamlit_quote_tool_pro_FIXED.py` as a real server and
+drives N simulated estimators over its websocket, speaking the same protobuf
+messages as the browser, so every session shares the server's cached catalog
+like it does in production. Each session picks equipment types and models,
+types searches, adds and removes items and fills in Review & Export.
+Reports rerun latency percentiles, failed reruns and server RSS for each
+session count; exits non-zero if any rerun failed.
+
+Run from the directory holding srt_database_organized.json:
+    python load_test_sessions.py --sessions 1 5 10 20 --rounds 3
+"""
+import argparse
+import asyncio
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_FILE = Path(__file__).resolve().parent / 'streamlit_quote_tool_pro_FIXED.py'
+SEARCH_TERMS = ['engine', 'hydraulic', 'replace', 'pump', 'filter', 'seal', '10.0']
+RERUN_TIMEOUT = 120
+SERVER_START_TIMEOUT = 60
+
+WIDGET_TYPES = ('selectbox', 'button', 'text_input', 'text_area')
+_FINAL_STATUSES = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """Launch the app under `streamlit run` and wait until it answers health checks"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(APP_FILE), '--server.headless', 'true',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.perf_counter() + SERVER_START_TIMEOUT
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"streamlit did not start within {SERVER_START_TIMEOUT}s")
+
+
+def server_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of the server process in MB (Linux /proc; None elsewhere)"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# ----------------------------------------------------------------------------
+# A session is a websocket plus what the browser would track: the widgets of
+# the last finished run and the values set so far (sent with every rerun).
+# ----------------------------------------------------------------------------
+
+async def _rerun(session: Dict, trigger: Dict = None):
+    """
+    Request a rerun and read messages until the script finishes (following any
+    st.rerun). Records the latency, or counts a failure when the run raised.
+    """
+    msg = BackMsg()
+    msg.rerun_script.query_string = ''
+    msg.rerun_script.widget_states.widgets.extend(session['values'].values())
+    if trigger is not None:
+        state = WidgetState(id=trigger['id'], trigger_value=True)
+        msg.rerun_script.widget_states.widgets.append(state)
+
+    start = time.perf_counter()
+    await session['ws'].send(msg.SerializeToString())
+    widgets, failed = [], False
+    while True:
+        forward = ForwardMsg()
+        forward.ParseFromString(await asyncio.wait_for(session['ws'].recv(), RERUN_TIMEOUT))
+        kind = forward.WhichOneof('type')
+        if kind == 'new_session':
+            widgets, failed = [], False
+        elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+            element = forward.delta.new_element
+            element_type = element.WhichOneof('type')
+            if element_type == 'exception':
+                failed = True
+            elif element_type in WIDGET_TYPES:
+                widget = getattr(element, element_type)
+                widgets.append({
+                    'type': element_type,
+                    'id': widget.id,
+                    'label': widget.label,
+                    'options': list(getattr(widget, 'options', [])),
+                    'sidebar': forward.metadata.delta_path[0] == 1
+                })
+        elif kind == 'script_finished' and forward.script_finished in _FINAL_STATUSES:
+            failed = failed or forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+            break
+
+    session['widgets'] = widgets
+    if failed:
+        session['failures'] += 1
+    else:
+        session['latencies'].append(time.perf_counter() - start)
+
+
+def _widget(session: Dict, label: str, sidebar: bool = None) -> Optional[Dict]:
+    return next((w for w in session['widgets']
+                 if w['label'] == label and (sidebar is None or w['sidebar'] == sidebar)), None)
+
+
+async def _set_value(session: Dict, widget: Dict, value: str):
+    session['values'][widget['id']] = WidgetState(id=widget['id'], string_value=value)
+    await _rerun(session)
+
+
+async def _click(session: Dict, widget: Dict):
+    await _rerun(session, trigger=widget)
+
+
+async def run_session(url: str, rounds: int, seed: int) -> Dict:
+    """One simulated estimator; returns its rerun latencies and failure count"""
+    rng = random.Random(seed)
+    session = {'widgets': [], 'values': {}, 'latencies': [], 'failures': 0}
+    async with websockets.connect(url, subprotocols=['streamlit'], max_size=None) as ws:
+        session['ws'] = ws
+        await _rerun(session)
+
+        for _ in range(rounds):
+            # Pick an equipment type and model
+            for label in ("Equipment Type", "Model"):
+                widget = _widget(session, label, sidebar=True)
+                if widget is None:
+                    break
+                await _set_value(session, widget, rng.choice(widget['options']))
+
+            # Search and add a few operations
+            search = _widget(session, "Search operations", sidebar=True)
+            if search is not None:
+                await _set_value(session, search, rng.choice(SEARCH_TERMS))
+            for _ in range(3):
+                add_buttons = [w for w in session['widgets'] if w['type'] == 'button' and w['sidebar']
+                               and '-add_' in w['id'] and '-add_kit_' not in w['id']]
+                if not add_buttons:
+                    break
+                await _click(session, rng.choice(add_buttons))
+
+            # Remove one item
+            remove_buttons = [w for w in session['widgets'] if w['type'] == 'button' and '-remove_' in w['id']]
+            if remove_buttons:
+                await _click(session, rng.choice(remove_buttons))
+
+            # Review & Export
+            customer = _widget(session, "Customer Name")
+            if customer is not None:
+                await _set_value(session, customer, f"Customer {rng.randint(1, 999)}")
+
+            if search is not None:
+                await _set_value(session, search, "")
+
+    return session
+
+
+async def _run_sessions(url: str, sessions: int, rounds: int) -> List[Dict]:
+    return await asyncio.gather(*(run_session(url, rounds, seed) for seed in range(sessions)))
+
+
+def run_load_test(port: int, server_pid: int, sessions: int, rounds: int) -> Dict:
+    start = time.perf_counter()
+    per_session = asyncio.run(_run_sessions(f"ws://127.0.0.1:{port}/_stcore/stream", sessions, rounds))
+    elapsed = time.perf_counter() - start
+
+    latencies = [lat for session in per_session for lat in session['latencies']]
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else (latencies or [float('nan')]) * 99
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'failed': sum(session['failures'] for session in per_session),
+        'seconds': elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p90_ms': quantiles[89] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+        'rss_mb': server_rss_mb(server_pid)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions against a real Streamlit server")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 20],
+                        help="Session counts to test, in order")
+    parser.add_argument('--rounds', type=int, default=3, help="Select/search/add/remove/export rounds per session")
+    parser.add_argument('--port', type=int, default=None, help="Server port (default: any free port)")
+    args = parser.parse_args()
+
+    port = args.port or _free_port()
+    server = start_server(port)
+    failed = 0
+    try:
+        rss = server_rss_mb(server.pid)
+        print(f"Server RSS at start: {rss:.0f} MB" if rss is not None else "Server RSS unavailable")
+        print(f"{'Sessions':>8} {'Reruns':>7} {'Failed':>7} {'Seconds':>8} {'p50 ms':>8} {'p90 ms':>8} "
+              f"{'p99 ms':>8} {'RSS MB':>7}")
+        for n in args.sessions:
+            r = run_load_test(port, server.pid, n, args.rounds)
+            failed += r['failed']
+            rss = f"{r['rss_mb']:>7.0f}" if r['rss_mb'] is not None else f"{'-':>7}"
+            print(f"{r['sessions']:>8} {r['reruns']:>7} {r['failed']:>7} {r['seconds']:>8.1f} "
+                  f"{r['p50_ms']:>8.0f} {r['p90_ms']:>8.0f} {r['p99_ms']:>8.0f} {rss}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    if failed:
+        print(f"⚠️ {failed} reruns raised an exception")
+        sys.exit(1)
@@ -0,0 +1,169 @@
+"""
+Memory benchmark for the SRT loader, per-session quote state and the
+process-wide rendered-line cache. Runs each stage under tracemalloc and
+reports, per stage, the peak and the retained (still referenced afterwards)
+allocations plus the source lines that allocated the most. Exits non-zero
+when a stage exceeds memory_budget.json.
+
+Budgets are bytes per SRT code for catalog stages and bytes per quote line
+for quote stages, so one budget file fits any catalog size. session_state is
+what each session keeps (its quote workspace); line_cache is the shared LRU
+of resolved lines, paid once per process. tracemalloc only sees Python's
+allocator: buffers pyarrow allocates itself (pandas' Arrow-backed strings)
+are not counted, and the process RSS will be higher.
+
+Run from the directory holding srt_database_organized.json:
+    python memory_benchmark.py --quote-lines 300
+    python memory_benchmark.py --top 5          # more allocation sites per stage
+"""
+import argparse
+import gc
+import io
+import json
+import sys
+import tracemalloc
+from itertools import islice
+import pandas as pd
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from load_srt_database import (
+    load_srt_database, group_operations, build_catalog, load_catalog_snapshot, load_service_kits,
+    catalog_num_codes, search_model_operations, QuoteLine
+)
+from quote_line_cache import new_line_cache, cached_quote_line
+from quote_variants import new_workspace, add_lines, variant_lines
+
+MEMORY_BUDGET_FILE = Path(__file__).resolve().parent / 'memory_budget.json'
+SEARCH_TERMS = ['engine', 'hydraulic', 'replace', 'pump', 'filter', 'seal', '10.0']
+# Stages budgeted per quote line; the rest are per SRT code
+QUOTE_STAGES = ('session_state', 'line_cache', 'export_buffers')
+
+
+def measure(stage: Callable, top: int = 3) -> Dict:
+    """Run stage() under tracemalloc; returns its result, peak/retained bytes and top allocation sites"""
+    gc.collect()
+    before_snapshot = tracemalloc.take_snapshot()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    result = stage()
+
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    sites = tracemalloc.take_snapshot().compare_to(before_snapshot, 'lineno')
+    return {
+        'result': result,
+        'peak': peak - before,
+        'retained': current - before,
+        'sites': [str(site) for site in sites[:top]]
+    }
+
+
+def _quote_lines(catalog: Dict, count: int) -> List[QuoteLine]:
+    """The first count (model_key, code) pairs of the catalog as quote lines"""
+    pairs = ((model_key, code) for model_key, codes in catalog['codes'].items() for code in codes)
+    return [QuoteLine(model_key, code) for model_key, code in islice(pairs, count)]
+
+
+def _session_workspace(catalog: Dict, count: int) -> Dict:
+    """The quote workspace a session keeps in st.session_state, holding count lines"""
+    workspace = new_workspace()
+    add_lines(workspace, _quote_lines(catalog, count))
+    return workspace
+
+
+def _fill_line_cache(catalog: Dict, lines: List[QuoteLine]) -> Dict:
+    """The shared line cache after the app has rendered lines once"""
+    cache = new_line_cache()
+    content_version = (catalog['version'], False)
+    for line in lines:
+        cached_quote_line(cache, catalog, line, content_version)
+    return cache
+
+
+def _export_buffers(quote_lines: List[Dict]) -> Dict:
+    """The Review & Export dataframe plus its CSV and Excel downloads"""
+    df = pd.DataFrame([
+        {'SRT Code': item['code'], 'Description': item['description'], 'Model': item['model'],
+         'Base Hours': f"{item['hours']:.1f}"}
+        for item in quote_lines
+    ])
+    excel = io.BytesIO()
+    with pd.ExcelWriter(excel, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Quote', index=False)
+    return {'df': df, 'csv': df.to_csv(index=False), 'excel': excel.getvalue()}
+
+
+def run_benchmark(quote_lines: int, top: int = 3) -> Dict[str, Dict]:
+    """Measure every stage in app order, keeping each stage's output alive like the app does"""
+    # Warm up lazy imports (openpyxl, pandas internals) so they are not charged to a stage
+    _export_buffers([{'code': '', 'description': '', 'model': '', 'hours': 0.0}])
+    tracemalloc.start()
+    stages = {}
+
+    stages['load_srt_database'] = measure(load_srt_database, top)
+    df, models = stages['load_srt_database']['result']
+    stages['group_operations'] = measure(lambda: group_operations(df), top)
+    stages['load_database'] = measure(
+        lambda: load_catalog_snapshot() or build_catalog(df, models, load_service_kits()), top
+    )
+    catalog = stages['load_database']['result']
+    num_codes = catalog_num_codes(catalog)
+
+    stages['search_results'] = measure(lambda: [
+        search_model_operations(catalog, model_key, term)
+        for model_key in catalog['codes'] for term in SEARCH_TERMS
+    ], top)
+    stages['session_state'] = measure(lambda: _session_workspace(catalog, quote_lines), top)
+    lines = variant_lines(stages['session_state']['result'])
+    stages['line_cache'] = measure(lambda: _fill_line_cache(catalog, lines), top)
+    resolved = [item for item, _ in stages['line_cache']['result']['entries'].values()]
+    stages['export_buffers'] = measure(lambda: _export_buffers(resolved), top)
+    tracemalloc.stop()
+
+    units = {'code': max(num_codes, 1), 'line': max(len(lines), 1)}
+    for name, stage in stages.items():
+        stage['per'] = 'line' if name in QUOTE_STAGES else 'code'
+        stage['units'] = units[stage['per']]
+        del stage['result']
+    return stages
+
+
+def check_budget(stages: Dict[str, Dict], budget: Dict[str, Dict]) -> List[str]:
+    """Messages for every stage whose peak or retained bytes per unit exceed the budget"""
+    failures = []
+    for name, stage in stages.items():
+        limits = budget.get(name, {})
+        for kind in ('peak', 'retained'):
+            limit = limits.get(f"{kind}_bytes_per_{stage['per']}")
+            actual = stage[kind] / stage['units']
+            if limit is not None and actual > limit:
+                failures.append(f"{name}: {kind} {actual:,.0f} B/{stage['per']} exceeds budget {limit:,.0f}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="tracemalloc memory benchmark with a checked-in budget")
+    parser.add_argument('--quote-lines', type=int, default=300, help="Lines in the simulated quote")
+    parser.add_argument('--top', type=int, default=3, help="Allocation sites shown per stage")
+    parser.add_argument('--budget', type=Path, default=MEMORY_BUDGET_FILE)
+    args = parser.parse_args()
+
+    stages = run_benchmark(args.quote_lines, args.top)
+
+    print(f"\n{'Stage':<18} {'Peak MB':>9} {'Retained MB':>12} {'Peak B/unit':>12} {'Kept B/unit':>12}")
+    for name, stage in stages.items():
+        print(f"{name:<18} {stage['peak'] / 2**20:>9.1f} {stage['retained'] / 2**20:>12.1f} "
+              f"{stage['peak'] / stage['units']:>12,.0f} {stage['retained'] / stage['units']:>12,.0f}  per {stage['per']}")
+        for site in stage['sites']:
+            print(f"    {site}")
+
+    with open(args.budget, 'r') as f:
+        failures = check_budget(stages, json.load(f))
+    if failures:
+        print("\n⚠️ Memory budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\n✓ Within memory budget ({args.budget.name})")
@@ -0,0 +1,57 @@
+"""
+Process-wide LRU of rendered quote lines.
+Sessions keep only compact QuoteLines; the resolved fields and Quote Builder
+markdown for each line are built once and shared by every session in the
+process. Lines are immutable, so an entry only goes stale when its content
+version (the catalog version and the calibrated-hours toggle) changes.
+
+Cache layout (one per process, e.g. in st.cache_resource):
+    entries - (model_key, code, overrides, content_version) -> (resolved fields, markdown), oldest first
+    lock    - guards entries across session threads
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from load_srt_database import QuoteLine, resolve_quote_line
+
+# Rendered quote lines kept per process (shared by every session)
+LINE_CACHE_SIZE = 20000
+
+
+def new_line_cache() -> Dict:
+    return {'entries': OrderedDict(), 'lock': threading.Lock()}
+
+
+def quote_line_html(item: Dict) -> str:
+    """Quote Builder markdown for one resolved quote line"""
+    book_note = f" (book {item['book_hours']:.1f})" if 'book_hours' in item else ""
+    return f"""
+    **{item['code']}** - {item['hours']:.1f} hrs{book_note}  
+    {item['description']}  
+    <small>Model: {item['model']}</small>
+    """
+
+
+def cached_quote_line(cache: Dict, catalog: Dict, line: QuoteLine, content_version: Tuple,
+                      hours_overlay: Dict = None, size: int = LINE_CACHE_SIZE) -> Tuple[Dict, str]:
+    """
+    (resolved fields, markdown) for a quote line, resolved on a miss and
+    evicting the least recently used entries past size. The resolved dict is
+    shared between sessions and must not be modified.
+    """
+    overrides = tuple(sorted(line.overrides.items())) if line.overrides else None
+    key = (line.model_key, line.code, overrides, content_version)
+    with cache['lock']:
+        entry = cache['entries'].get(key)
+        if entry is not None:
+            cache['entries'].move_to_end(key)
+            return entry
+
+    item = resolve_quote_line(catalog, line, hours_overlay)
+    entry = (item, quote_line_html(item))
+    with cache['lock']:
+        cache['entries'][key] = entry
+        while len(cache['entries']) > size:
+            cache['entries'].popitem(last=False)
+    return entry
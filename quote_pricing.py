@@ -0,0 +1,131 @@
+"""
+Quote pricing helpers shared by the Streamlit app and offline tools.
+Vectorized with numpy so whole difficulty matrices can be priced at once.
+"""
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Default labor rate ($/hour)
+DEFAULT_LABOR_RATE = 125.00
+
+# Enhanced Difficulty Matrix
+DIFFICULTY_FACTORS = {
+    'age': {
+        "0-2 years (New)": 1.0,
+        "3-5 years (Like New)": 1.05,
+        "6-8 years (Good)": 1.15,
+        "9-12 years (Average)": 1.25,
+        "13-15 years (Older)": 1.35,
+        "16-20 years (Old)": 1.50,
+        "20+ years (Very Old)": 1.75
+    },
+    'condition': {
+        "Excellent - Well maintained": 1.0,
+        "Good - Normal wear": 1.10,
+        "Fair - Some issues": 1.25,
+        "Poor - Multiple problems": 1.40,
+        "Severe - Major overhaul needed": 1.60
+    },
+    'location': {
+        "Shop - Full facilities": 1.0,
+        "On-site - Accessible": 1.15,
+        "On-site - Limited access": 1.30,
+        "Remote - Difficult terrain": 1.50,
+        "Remote - Extreme conditions": 1.75
+    },
+    'manufacturer': {
+        "CNH (Case/New Holland)": 1.0,  # Your specialty
+        "Caterpillar": 1.05,
+        "John Deere": 1.05,
+        "Komatsu": 1.10,
+        "Volvo": 1.10,
+        "Hitachi": 1.15,
+        "Liebherr": 1.15,
+        "JCB": 1.08,
+        "Doosan": 1.12,
+        "Kubota": 1.05,
+        "Other": 1.20
+    },
+    'urgency': {
+        "Standard - Normal schedule": 1.0,
+        "Priority - Within 3 days": 1.20,
+        "Rush - Next day": 1.50,
+        "Emergency - Same day": 2.00
+    },
+    'complexity': {
+        "Routine - Standard service": 1.0,
+        "Moderate - Some diagnosis needed": 1.15,
+        "Complex - Extensive troubleshooting": 1.30,
+        "Severe - Complete tear-down": 1.50
+    }
+}
+
+# Labor rates ($/hour) per branch and technician class
+BRANCH_LABOR_RATES = {
+    "Main Branch": {'Shop': 125.00, 'Field': 145.00},
+    "North Branch": {'Shop': 120.00, 'Field': 140.00},
+    "South Branch": {'Shop': 115.00, 'Field': 135.00},
+    "Coastal Branch": {'Shop': 130.00, 'Field': 155.00}
+}
+TECH_CLASSES = ['Shop', 'Field']
+
+def tech_class_for_location(location_level: str) -> str:
+    """Shop technicians work 'Shop - ...' locations, field technicians everything else"""
+    return 'Shop' if location_level.startswith('Shop') else 'Field'
+
+def rate_table(branch_rates: Dict[str, Dict[str, float]] = BRANCH_LABOR_RATES) -> Tuple[List[str], np.ndarray]:
+    """Branch names and a branches x TECH_CLASSES array of labor rates"""
+    branches = list(branch_rates)
+    rates = np.array([[branch_rates[branch][tech] for tech in TECH_CLASSES] for branch in branches])
+    return branches, rates
+
+def price_rate_grid(line_hours: List[float], multiplier: float, rates: np.ndarray) -> np.ndarray:
+    """
+    Cost of every line under every rate in one broadcast, shaped
+    (lines, branches, tech classes); sum over axis 0 for quote totals.
+    """
+    return np.multiply.outer(np.asarray(line_hours, dtype=float) * multiplier, rates)
+
+# Percentiles reported by the scenario sweep
+SWEEP_PERCENTILES = [5, 25, 50, 75, 95]
+
+def total_multiplier(selections: Dict[str, str],
+                     difficulty_factors: Dict[str, Dict[str, float]] = DIFFICULTY_FACTORS) -> float:
+    """
+    Combined multiplier for one scenario, given the selected level label per
+    factor. Factors left out count as 1.0; unknown labels raise KeyError.
+    """
+    multiplier = 1.0
+    for factor, level in selections.items():
+        multiplier *= difficulty_factors[factor][level]
+    return multiplier
+
+def build_multiplier_tensor(difficulty_factors: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """
+    Combined multiplier for every combination of difficulty factors.
+    The result has one axis per factor, in the order of difficulty_factors
+    (e.g. 7 x 5 x 5 x 11 x 4 x 4 for the default matrix).
+    """
+    tensor = np.ones(())
+    for levels in difficulty_factors.values():
+        tensor = np.multiply.outer(tensor, np.fromiter(levels.values(), dtype=float))
+    return tensor
+
+def sweep_quote(base_hours: float, labor_rate: float, multiplier_tensor: np.ndarray,
+                percentiles: List[int] = SWEEP_PERCENTILES) -> Dict:
+    """Price a quote under every difficulty scenario in one vectorized pass"""
+    multipliers = multiplier_tensor.ravel()
+    costs = multipliers * (base_hours * labor_rate)
+    return {
+        'scenarios': multipliers.size,
+        'multipliers': multipliers,
+        'costs': costs,
+        'min_cost': costs.min(),
+        'max_cost': costs.max(),
+        'mean_cost': costs.mean(),
+        'percentiles': dict(zip(percentiles, np.percentile(costs, percentiles)))
+    }
+
+def scenario_rank(multiplier_tensor: np.ndarray, multiplier: float) -> float:
+    """Share of scenarios (0-100) that price at or below the given multiplier"""
+    return 100.0 * np.count_nonzero(multiplier_tensor <= multiplier + 1e-9) / multiplier_tensor.size
@@ -0,0 +1,144 @@
+"""
+"Frequently quoted together" suggestions.
+An offline job reads historical quote lines, counts how often two codes
+appear on the same quote for the same model (a sparse co-occurrence matrix
+per model_key), and keeps the top-N neighbours per code. The app loads the
+result once and looks suggestions up in O(1) when an operation is added.
+
+Historical quotes CSV (one row per quote line, each quote's lines together,
+e.g. sorted by quote_id; it is read in chunks of whole quotes):
+    quote_id,model_key,code
+    Q-1001,excavator_CX210D,10.001.AD.10
+    ...
+
+Run:
+    python quote_suggestions.py quote_history.csv --top 5
+"""
+import argparse
+import itertools
+import json
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Union
+
+from load_srt_database import write_atomic
+
+SUGGESTIONS_FILE = Path('srt_cooccurrence.json')
+DEFAULT_TOP_N = 5
+# Quote lines counted at a time; a quote's lines stay in one chunk
+CHUNK_ROWS = 200_000
+PAIR_COLUMNS = ['model_key', 'code', 'code_other']
+
+
+def _whole_quotes(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Re-cut chunks of quote lines so no quote spans two of them, holding back
+    the last quote of each chunk until the next one shows where it ends.
+    Each quote's lines must be contiguous (e.g. sorted by quote_id).
+    """
+    seen = set()
+    carry = None
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            whole, carry = carry, None
+        else:
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            if chunk.empty:
+                continue
+            tail = (chunk['quote_id'] == chunk['quote_id'].iloc[-1]).to_numpy()
+            whole, carry = chunk[~tail], chunk[tail]
+        if whole is None or whole.empty:
+            continue
+        quote_ids = whole['quote_id'].unique()
+        if seen.intersection(quote_ids):
+            raise ValueError("Quote history must list each quote's lines together (sort it by quote_id)")
+        seen.update(quote_ids)
+        yield whole
+
+
+def _pair_counts(lines: pd.DataFrame) -> pd.DataFrame:
+    """Times each (model_key, code, code_other) pair is quoted together in lines"""
+    lines = lines[['quote_id', 'model_key', 'code']].drop_duplicates()
+
+    # Self-join lines on the same quote and model to get every co-quoted pair
+    pairs = lines.merge(lines, on=['quote_id', 'model_key'], suffixes=('', '_other'))
+    pairs = pairs[pairs['code'] != pairs['code_other']]
+    return pairs.groupby(PAIR_COLUMNS, sort=False).size().reset_index(name='count')
+
+
+def _sum_counts(counts: List[pd.DataFrame]) -> pd.DataFrame:
+    return pd.concat(counts, ignore_index=True).groupby(PAIR_COLUMNS, sort=False)['count'].sum().reset_index()
+
+
+def build_cooccurrence(history: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                       top_n: int = DEFAULT_TOP_N) -> Dict[str, Dict[str, List]]:
+    """
+    Top-N co-quoted codes per (model_key, code), as
+    {model_key: {code: [[other_code, times_quoted_together], ...]}}.
+    history is a frame of quote lines or chunks of one (read_history); pairs
+    are counted a chunk of whole quotes at a time and summed into a running
+    total, so only one chunk's pairs are materialised at once.
+    """
+    if isinstance(history, pd.DataFrame):
+        lines = history.sort_values('quote_id', kind='stable')
+        history = (lines.iloc[i:i + CHUNK_ROWS] for i in range(0, len(lines), CHUNK_ROWS))
+
+    # Chunk counts are folded into the total once they outgrow it, which keeps
+    # the summing linear in the number of distinct pairs
+    total, pending, pending_rows = None, [], 0
+    for chunk in _whole_quotes(history):
+        counts = _pair_counts(chunk)
+        pending.append(counts)
+        pending_rows += len(counts)
+        if pending_rows > max(0 if total is None else len(total), CHUNK_ROWS):
+            total = _sum_counts(pending if total is None else [total] + pending)
+            pending, pending_rows = [], 0
+    if pending:
+        total = _sum_counts(pending if total is None else [total] + pending)
+    if total is None or total.empty:
+        return {}
+
+    counts = (
+        total.astype({'count': 'int64'})
+        .sort_values(['model_key', 'code', 'count', 'code_other'], ascending=[True, True, False, True])
+    )
+    top = counts.groupby(['model_key', 'code'], sort=False).head(top_n)
+
+    suggestions = {}
+    for model_key, code, other, count in top.itertuples(index=False):
+        suggestions.setdefault(model_key, {}).setdefault(code, []).append([other, int(count)])
+    return suggestions
+
+
+def read_history(path: Path, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Quote lines from a history CSV, chunk_rows at a time"""
+    return pd.read_csv(path, usecols=['quote_id', 'model_key', 'code'], dtype=str, chunksize=chunk_rows)
+
+
+def load_suggestions(path: Path = SUGGESTIONS_FILE) -> Dict[str, Dict[str, List]]:
+    """Load precomputed suggestions, or an empty table if the job has not run"""
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def get_suggestions(suggestions: Dict, model_key: str, code: str) -> List[str]:
+    """Codes most often quoted with code on model_key, best first"""
+    return [other for other, _ in suggestions.get(model_key, {}).get(code, [])]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build 'frequently quoted together' suggestions")
+    parser.add_argument('history', type=Path, help="CSV with quote_id, model_key and code columns")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_N, help="Neighbours kept per code")
+    parser.add_argument('--out', type=Path, default=SUGGESTIONS_FILE)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help="Quote lines counted at a time (the CSV must list each quote's lines together)")
+    args = parser.parse_args()
+
+    suggestions = build_cooccurrence(read_history(args.history, args.chunk_rows), args.top)
+    write_atomic(args.out, json.dumps(suggestions).encode('utf-8'))
+    print(f"✓ Wrote suggestions for {sum(len(codes) for codes in suggestions.values())} codes "
+          f"across {len(suggestions)} models -> {args.out}")
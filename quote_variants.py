@@ -0,0 +1,102 @@
+"""
+Named quote variants (e.g. repair vs overhaul) sharing one line store.
+Every QuoteLine is stored once under a line id; a variant is an immutable
+tuple of line ids. Cloning a variant shares its tuple, so it costs O(1) time
+and memory whatever the quote size; editing a variant builds a new tuple for
+that variant only (copy-on-write), leaving its clones untouched.
+
+Workspace layout (kept in st.session_state):
+    lines     - line_id -> QuoteLine (shared line store)
+    next_id   - next line id to hand out
+    variants  - variant name -> tuple of line ids, in quote order
+    active    - name of the variant being edited
+"""
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from load_srt_database import QuoteLine
+
+DEFAULT_VARIANT = "Quote A"
+
+
+def new_workspace(name: str = DEFAULT_VARIANT) -> Dict:
+    return {'lines': {}, 'next_id': 0, 'variants': {name: ()}, 'active': name}
+
+
+def variant_items(workspace: Dict, name: str = None) -> List[Tuple[int, QuoteLine]]:
+    """(line_id, QuoteLine) pairs of a variant (the active one by default), in order"""
+    lines = workspace['lines']
+    return [(line_id, lines[line_id]) for line_id in workspace['variants'][name or workspace['active']]]
+
+
+def variant_lines(workspace: Dict, name: str = None) -> List[QuoteLine]:
+    return [line for _, line in variant_items(workspace, name)]
+
+
+def _release_lines(workspace: Dict, line_ids: Iterable[int]):
+    """Drop lines from the store once no variant refers to them"""
+    in_use = set().union(*workspace['variants'].values())
+    for line_id in line_ids:
+        if line_id not in in_use:
+            workspace['lines'].pop(line_id, None)
+
+
+def add_lines(workspace: Dict, new_lines: Iterable[QuoteLine]):
+    """Append lines to the active variant"""
+    line_ids = []
+    for line in new_lines:
+        workspace['lines'][workspace['next_id']] = line
+        line_ids.append(workspace['next_id'])
+        workspace['next_id'] += 1
+    active = workspace['active']
+    workspace['variants'][active] = workspace['variants'][active] + tuple(line_ids)
+
+
+def remove_line(workspace: Dict, position: int):
+    """Remove the line at position from the active variant"""
+    active = workspace['active']
+    line_ids = workspace['variants'][active]
+    workspace['variants'][active] = line_ids[:position] + line_ids[position + 1:]
+    _release_lines(workspace, [line_ids[position]])
+
+
+def clear_variant(workspace: Dict):
+    active = workspace['active']
+    line_ids = workspace['variants'][active]
+    workspace['variants'][active] = ()
+    _release_lines(workspace, line_ids)
+
+
+def create_variant(workspace: Dict, name: str, clone_from: str = None):
+    """Add a variant (empty, or sharing clone_from's lines) and make it active"""
+    if name in workspace['variants']:
+        raise ValueError(f"A variant named '{name}' already exists")
+    workspace['variants'][name] = workspace['variants'][clone_from] if clone_from else ()
+    workspace['active'] = name
+
+
+def delete_variant(workspace: Dict, name: str):
+    """Delete a variant; the last remaining variant cannot be deleted"""
+    if len(workspace['variants']) == 1:
+        raise ValueError("A quote needs at least one variant")
+    line_ids = workspace['variants'].pop(name)
+    if workspace['active'] == name:
+        workspace['active'] = next(iter(workspace['variants']))
+    _release_lines(workspace, line_ids)
+
+
+def compare_variants(workspace: Dict, line_hours: Callable[[QuoteLine], float]) -> Dict[str, Dict]:
+    """
+    Lines and base hours per variant. Each stored line is resolved once, however
+    many variants share it; totals are then gathered per variant with numpy.
+    """
+    positions = {line_id: i for i, line_id in enumerate(workspace['lines'])}
+    hours = np.fromiter((line_hours(line) for line in workspace['lines'].values()),
+                        dtype=float, count=len(positions))
+    return {
+        name: {
+            'lines': len(line_ids),
+            'base_hours': float(hours[[positions[line_id] for line_id in line_ids]].sum())
+        }
+        for name, line_ids in workspace['variants'].items()
+    }
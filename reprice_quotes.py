@@ -0,0 +1,109 @@
+"""
+Bulk repricing of saved quotes after DEFAULT_LABOR_RATE or DIFFICULTY_FACTORS
+change. Streams saved quote lines in columnar chunks, looks every line's
+multiplier up in the current multiplier tensor in one vectorized step, and
+writes a diff report of old vs new totals per quote.
+
+Saved quote lines CSV (one row per line; quote-level columns repeat per line,
+factor columns hold the level labels chosen on the Difficulty Factors tab):
+    quote_id,model_key,code,hours,cost,age,condition,location,manufacturer,urgency,complexity
+    Q-1001,excavator_CX210D,10.001.AD.10,2.5,390.63,9-12 years (Average),...
+    ...
+
+Run:
+    python reprice_quotes.py saved_quote_lines.csv --labor-rate 135
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from load_srt_database import write_atomic
+from quote_pricing import DEFAULT_LABOR_RATE, DIFFICULTY_FACTORS, build_multiplier_tensor
+
+REPRICE_REPORT_FILE = Path('quote_reprice_report.csv')
+DEFAULT_CHUNKSIZE = 500_000
+
+
+def _level_positions(labels: pd.Series, levels: List[str]) -> np.ndarray:
+    """Index of each label in levels, or -1 for missing and unknown labels"""
+    labels = labels.astype('category')
+    # Map each distinct label once; the trailing -1 is what NaN (code -1) picks
+    positions = np.array([levels.index(label) if label in levels else -1
+                          for label in labels.cat.categories] + [-1])
+    return positions[labels.cat.codes.to_numpy()]
+
+
+def line_multipliers(lines: pd.DataFrame, multiplier_tensor: np.ndarray,
+                     difficulty_factors: Dict[str, Dict[str, float]] = DIFFICULTY_FACTORS) -> np.ndarray:
+    """Combined multiplier per line from its factor labels (NaN where a label is unknown)"""
+    positions = [_level_positions(lines[factor], list(levels)) for factor, levels in difficulty_factors.items()]
+    known = np.logical_and.reduce([p >= 0 for p in positions])
+    multipliers = multiplier_tensor[tuple(np.where(p >= 0, p, 0) for p in positions)]
+    return np.where(known, multipliers, np.nan)
+
+
+def _reprice_chunk(lines: pd.DataFrame, labor_rate: float, multiplier_tensor: np.ndarray) -> pd.DataFrame:
+    """Old and new totals per quote for one chunk of lines"""
+    new_cost = lines['hours'].to_numpy() * line_multipliers(lines, multiplier_tensor) * labor_rate
+    priced = pd.DataFrame({
+        'quote_id': lines['quote_id'],
+        'lines': 1,
+        'unpriced_lines': np.isnan(new_cost).astype(int),
+        'base_hours': lines['hours'],
+        'old_total': lines['cost'],
+        'new_total': new_cost
+    })
+    return priced.groupby('quote_id', sort=False).sum(min_count=1)
+
+
+def reprice_quotes(chunks: Iterable[pd.DataFrame], labor_rate: float = DEFAULT_LABOR_RATE,
+                   difficulty_factors: Dict[str, Dict[str, float]] = DIFFICULTY_FACTORS) -> pd.DataFrame:
+    """
+    Diff report of old vs new totals per quote. A quote's lines may be split
+    across chunks; their partial sums are combined at the end. Quotes with
+    unpriced lines get no new total (NaN), since it would leave those lines out.
+    """
+    multiplier_tensor = build_multiplier_tensor(difficulty_factors)
+    partials = [_reprice_chunk(chunk, labor_rate, multiplier_tensor) for chunk in chunks]
+    if not partials:
+        return pd.DataFrame(columns=['quote_id', 'lines', 'unpriced_lines', 'base_hours',
+                                     'old_total', 'new_total', 'change', 'change_pct'])
+
+    report = pd.concat(partials).groupby(level=0, sort=False).sum(min_count=1)
+    report.loc[report['unpriced_lines'] > 0, 'new_total'] = np.nan
+    report['change'] = report['new_total'] - report['old_total']
+    report['change_pct'] = 100.0 * report['change'] / report['old_total'].where(report['old_total'] != 0)
+    return report.round(2).reset_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reprice saved quotes with the current rate and difficulty matrix")
+    parser.add_argument('lines', type=Path, help="CSV of saved quote lines (see module docstring)")
+    parser.add_argument('--labor-rate', type=float, default=DEFAULT_LABOR_RATE, help="New labor rate ($/hour)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Lines read per chunk")
+    parser.add_argument('--out', type=Path, default=REPRICE_REPORT_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    factor_columns = list(DIFFICULTY_FACTORS)
+    chunks = pd.read_csv(
+        args.lines,
+        usecols=['quote_id', 'hours', 'cost'] + factor_columns,
+        dtype={'quote_id': str, 'hours': float, 'cost': float, **{factor: 'category' for factor in factor_columns}},
+        chunksize=args.chunksize
+    )
+    report = reprice_quotes(chunks, args.labor_rate)
+    write_atomic(args.out, report.to_csv(index=False).encode('utf-8'))
+
+    print(f"✓ Repriced {len(report):,} quotes ({int(report['lines'].sum()):,} lines) "
+          f"in {time.perf_counter() - start:.1f}s -> {args.out}")
+    priced = report[report['unpriced_lines'] == 0]
+    print(f"  Total: ${priced['old_total'].sum():,.2f} -> ${priced['new_total'].sum():,.2f} "
+          f"({int((priced['change'] > 0).sum()):,} up, {int((priced['change'] < 0).sum()):,} down)")
+    unpriced = len(report) - len(priced)
+    if unpriced:
+        print(f"⚠️ {unpriced:,} quotes have lines with factor levels no longer in DIFFICULTY_FACTORS "
+              f"(not repriced, left out of the total)")
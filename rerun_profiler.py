@@ -0,0 +1,56 @@
+"""
+cProfile capture for individual Streamlit reruns.
+The app starts a profile at the top of the script and finishes it at the end
+(or at the start of the next rerun when st.rerun/st.stop cut the run short).
+Each finished profile keeps its raw stats in .pstats format, so a download
+opens with `python -m pstats profile.pstats` or snakeviz.
+"""
+import cProfile
+import marshal
+import pstats
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional
+
+TOP_FUNCTIONS = 25
+
+
+def start_profile() -> Optional[Dict]:
+    """Start profiling the current thread; None if another profiler is already active"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process
+        return None
+    return {'profiler': profiler, 'started': time.perf_counter(), 'started_at': datetime.now()}
+
+
+def top_functions(stats: pstats.Stats, limit: int = TOP_FUNCTIONS) -> pd.DataFrame:
+    """Functions with the most cumulative time, one row each"""
+    rows = [
+        {
+            'function': f"{func} ({file.rsplit('/', 1)[-1]}:{line})" if line else func,
+            'calls': calls,
+            'own_s': own_time,
+            'cumulative_s': cumulative_time
+        }
+        for (file, line, func), (_, calls, own_time, cumulative_time, _) in stats.stats.items()
+    ]
+    table = pd.DataFrame(rows, columns=['function', 'calls', 'own_s', 'cumulative_s'])
+    return table.nlargest(limit, 'cumulative_s').reset_index(drop=True)
+
+
+def finish_profile(handle: Dict) -> Dict:
+    """Stop a profile started by start_profile; returns its summary and .pstats bytes"""
+    profiler = handle['profiler']
+    profiler.disable()
+    seconds = time.perf_counter() - handle['started']
+    stats = pstats.Stats(profiler)
+    return {
+        'started_at': handle['started_at'],
+        'seconds': seconds,
+        'pstats': marshal.dumps(stats.stats),
+        'top': top_functions(stats)
+    }
@@ -0,0 +1,307 @@
+"""
+Local JSON API for SRT catalog search and quote pricing.
+Serves the same in-memory catalog and difficulty matrix as the Streamlit app,
+for dispatch/ERP integrations. Standard library asyncio only.
+
+Run:
+    python srt_api_server.py --host 127.0.0.1 --port 8600
+
+Endpoints:
+    GET  /models                                  model_lookup
+    GET  /search?model_key=...&q=...&limit=20     catalog search (model_key optional)
+                 &min_hours=...&max_hours=...&section=...
+    POST /quote                                   price a quote (see price_quote_request)
+    POST /batch                                   {"requests": [{"method", "path", "body"}, ...]}
+
+Connections are kept alive (HTTP/1.1) unless the client sends "Connection: close".
+"""
+import argparse
+import asyncio
+import itertools
+import json
+from http import HTTPStatus
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from load_srt_database import (
+    load_catalog, apply_pending_deltas, search_model_operations, operation_description
+)
+from quote_pricing import DEFAULT_LABOR_RATE, total_multiplier
+
+# How often to look for new catalog delta files (seconds)
+DELTA_POLL_INTERVAL = 30
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 500
+MAX_BODY_BYTES = 10 * 1024 * 1024
+# Header lines accepted per request; each line is also capped by the
+# StreamReader limit (64 KiB)
+MAX_HEADERS = 100
+
+
+class ApiError(Exception):
+    """Error reported to the client as a JSON body with the given status"""
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _query_param(params: Dict, name: str, default=None, cast=str):
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid value for '{name}'")
+
+
+def search_request(catalog: Dict, params: Dict) -> Dict:
+    """Search one model (model_key given) or every model, up to limit results"""
+    query = _query_param(params, 'q', '')
+    limit = min(max(_query_param(params, 'limit', SEARCH_DEFAULT_LIMIT, int), 1), SEARCH_MAX_LIMIT)
+    min_hours = _query_param(params, 'min_hours', None, float)
+    max_hours = _query_param(params, 'max_hours', None, float)
+    hours_range = None
+    if min_hours is not None or max_hours is not None:
+        hours_range = (min_hours if min_hours is not None else 0.0,
+                       max_hours if max_hours is not None else float('inf'))
+    section = _query_param(params, 'section')
+
+    model_key = _query_param(params, 'model_key')
+    if model_key is not None:
+        if model_key not in catalog['model_lookup']:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown model '{model_key}'")
+        model_keys = [model_key]
+    else:
+        model_keys = list(catalog['model_lookup'])
+
+    results = []
+    total = 0
+    for mk in model_keys:
+        ops = search_model_operations(catalog, mk, query, hours_range=hours_range, section=section)
+        total += len(ops)
+        for op in ops[:limit - len(results)]:
+            results.append({'model_key': mk, 'code': op['code'],
+                            'description': operation_description(catalog, mk, op), 'hours': op['hours']})
+
+    return {'total': total, 'results': results}
+
+
+def price_quote_request(catalog: Dict, body: Dict) -> Dict:
+    """
+    Price a quote. Body:
+        {
+          "lines": [{"model_key": "...", "code": "..."},          # catalog line
+                    {"code": "...", "description": "...", "hours": 1.5}],  # manual line
+          "factors": {"age": "9-12 years (Average)", ...},       # level labels, optional
+          "labor_rate": 125.0                                     # optional
+        }
+    """
+    if not isinstance(body, dict) or not isinstance(body.get('lines'), list):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Body must be an object with a 'lines' list")
+
+    try:
+        multiplier = total_multiplier(body.get('factors', {}))
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown difficulty factor or level: {e}")
+    try:
+        labor_rate = float(body.get('labor_rate', DEFAULT_LABOR_RATE))
+    except (TypeError, ValueError):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "labor_rate must be numeric")
+
+    lines = []
+    unknown = []
+    for line in body['lines']:
+        if not isinstance(line, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Each line must be an object")
+        if 'hours' in line:
+            try:
+                op = {'code': line.get('code', ''), 'description': line.get('description', ''),
+                      'hours': float(line['hours'])}
+            except (TypeError, ValueError):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Line hours must be numeric")
+        else:
+            if not isinstance(line.get('model_key'), str) or not isinstance(line.get('code'), str):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Catalog lines need string 'model_key' and 'code'")
+            op = catalog['codes'].get(line['model_key'], {}).get(line['code'])
+            if op is None:
+                unknown.append({'model_key': line.get('model_key'), 'code': line.get('code')})
+                continue
+            op = {'code': op['code'], 'description': operation_description(catalog, line['model_key'], op),
+                  'hours': op['hours']}
+
+        adjusted_hours = op['hours'] * multiplier
+        lines.append({
+            'model_key': line.get('model_key'),
+            'code': op['code'],
+            'description': op['description'],
+            'base_hours': op['hours'],
+            'adjusted_hours': adjusted_hours,
+            'cost': adjusted_hours * labor_rate
+        })
+
+    base_hours = sum(line['base_hours'] for line in lines)
+    return {
+        'lines': lines,
+        'unknown': unknown,
+        'base_hours': base_hours,
+        'multiplier': multiplier,
+        'adjusted_hours': base_hours * multiplier,
+        'labor_rate': labor_rate,
+        'total_cost': base_hours * multiplier * labor_rate
+    }
+
+
+def dispatch(catalog: Dict, method: str, target: str, body) -> Tuple[HTTPStatus, Dict]:
+    """Route one request; returns (status, JSON-able body)"""
+    try:
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+
+        if method == 'GET' and url.path == '/models':
+            return HTTPStatus.OK, {'version': catalog['version'], 'models': catalog['model_lookup']}
+        if method == 'GET' and url.path == '/search':
+            return HTTPStatus.OK, search_request(catalog, params)
+        if method == 'POST' and url.path == '/quote':
+            return HTTPStatus.OK, price_quote_request(catalog, body)
+        if method == 'POST' and url.path == '/batch':
+            if not isinstance(body, dict) or not isinstance(body.get('requests'), list):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Body must be an object with a 'requests' list")
+            responses = []
+            for sub in body['requests']:
+                if (not isinstance(sub, dict) or not isinstance(sub.get('method', 'GET'), str)
+                        or not isinstance(sub.get('path', ''), str) or sub.get('path', '').startswith('/batch')):
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': "Invalid batch entry"}
+                else:
+                    status, payload = dispatch(catalog, sub.get('method', 'GET').upper(), sub.get('path', ''), sub.get('body'))
+                responses.append({'status': status.value, 'body': payload})
+            return HTTPStatus.OK, {'responses': responses}
+
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+    except ApiError as e:
+        return e.status, {'error': str(e)}
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """Read one HTTP request; returns None when the client closed the connection"""
+    try:
+        request_line = await reader.readline()
+    except ValueError:
+        # LimitOverrunError surfaces from readline() as ValueError
+        raise ApiError(HTTPStatus.REQUEST_URI_TOO_LONG, "Request line too long")
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    for count in itertools.count():
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Header line too long")
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if count >= MAX_HEADERS:
+            raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = None
+    if length:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except ValueError:
+            # JSONDecodeError, or bytes that are not UTF-8
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+
+    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+    return method.upper(), target, body, keep_alive
+
+
+def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, payload: Dict, keep_alive: bool):
+    data = json.dumps(payload).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + data)
+
+
+def make_handler(catalog: Dict):
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ApiError as e:
+                    _write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, target, body, keep_alive = request
+                try:
+                    status, payload = dispatch(catalog, method, target, body)
+                except Exception as e:
+                    # Answer instead of dropping the connection on an unexpected error
+                    print(f"⚠️ {method} {target} failed: {e!r}")
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "Internal server error"}
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return handle_connection
+
+
+def _apply_deltas(catalog: Dict):
+    applied, rejected = apply_pending_deltas(catalog)
+    for summary in applied:
+        print(f"✓ Applied catalog delta v{summary['version']}")
+    for delta_file, reason in rejected.items():
+        print(f"⚠️ Skipped catalog delta {delta_file}: {reason}")
+
+
+async def poll_deltas(catalog: Dict):
+    """Apply new catalog delta files while the service runs"""
+    while True:
+        await asyncio.sleep(DELTA_POLL_INTERVAL)
+        _apply_deltas(catalog)
+
+
+async def serve(host: str, port: int):
+    catalog, _ = load_catalog()
+    _apply_deltas(catalog)
+
+    server = await asyncio.start_server(make_handler(catalog), host, port)
+    print(f"✓ Serving SRT API on http://{host}:{port}")
+    async with server:
+        await asyncio.gather(server.serve_forever(), poll_deltas(catalog))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON API for SRT search and quote pricing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
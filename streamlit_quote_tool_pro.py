@@ -5,6 +5,7 @@
 import streamlit as st
 import pandas as pd
 import json
+import heapq
 from pathlib import Path
 from datetime import datetime
 import io
@@ -232,6 +233,61 @@ def load_database():
 
 database = load_database()
 
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+SEARCH_RESULT_LIMIT = 10
+
+def search_relevance(search_lower, op):
+    """Relevance score for a matching operation, or 0 if it does not match"""
+    code_lower = op['code'].lower()
+    if code_lower == search_lower:
+        return 4
+    if search_lower in code_lower:
+        return 3
+    desc_lower = op['description'].lower()
+    if desc_lower.startswith(search_lower):
+        return 2
+    if search_lower in desc_lower:
+        return 1
+    return 0
+
+def iter_matches(search_lower, search_models):
+    """Lazily yield (score, model, op) for every matching operation"""
+    for model in search_models:
+        for op in database[model]:
+            score = search_relevance(search_lower, op)
+            if score:
+                yield score, model, op
+
+def top_matches(matches, k=SEARCH_RESULT_LIMIT):
+    """
+    Keep the k most relevant matches with a bounded heap while counting the rest.
+    Ties keep catalog order. Returns (results, total_count).
+    """
+    heap = []
+    total = 0
+    for score, model, op in matches:
+        # Negated sequence number so earlier matches win ties
+        entry = (score, -total, model, op)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+        total += 1
+    
+    results = [
+        {
+            'model': model,
+            'code': op['code'],
+            'description': op['description'],
+            'hours': op['hours']
+        }
+        for score, seq, model, op in sorted(heap, reverse=True)
+    ]
+    return results, total
+
 # ============================================================================
 # SESSION STATE INITIALIZATION
 # ============================================================================
@@ -299,7 +355,6 @@ with st.sidebar:
     if search_query:
         st.markdown(f"#### Search Results for '{search_query}'")
         
-        results = []
         search_lower = search_query.lower()
         
         # Search in selected model or all models
@@ -308,24 +363,13 @@ with st.sidebar:
         else:
             search_models = [selected_model]
         
-        for model in search_models:
-            for op in database[model]:
-                code_match = search_lower in op['code'].lower()
-                desc_match = search_lower in op['description'].lower()
-                
-                if code_match or desc_match:
-                    results.append({
-                        'model': model,
-                        'code': op['code'],
-                        'description': op['description'],
-                        'hours': op['hours']
-                    })
+        results, total_matches = top_matches(iter_matches(search_lower, search_models))
         
         if results:
-            st.success(f"✓ Found {len(results)} operations")
+            st.success(f"✓ Found {total_matches} operations")
             
-            # Display results
-            for i, result in enumerate(results[:10]):  # Show top 10
+            # Display results (top 10 by relevance)
+            for i, result in enumerate(results):
                 with st.container():
                     col1, col2 = st.columns([3, 1])
                     
@@ -343,8 +387,8 @@ with st.sidebar:
                     
                     st.markdown("---")
             
-            if len(results) > 10:
-                st.info(f"Showing 10 of {len(results)} results. Refine search to see more.")
+            if total_matches > len(results):
+                st.info(f"Showing top {len(results)} of {total_matches} results. Refine search to see more.")
         else:
             st.warning(f"No results found for '{search_query}'")
     else:
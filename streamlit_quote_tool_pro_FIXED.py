@@ -4,11 +4,32 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
 from pathlib import Path
 from datetime import datetime
 import io
-from load_srt_database import load_srt_database, get_models_by_type
+from collections import deque
+from load_srt_database import (
+    load_catalog, catalog_num_codes,
+    search_model_operations, apply_pending_deltas, parse_code_list, resolve_codes,
+    get_hours_bounds, get_section_counts,
+    QuoteLine, quote_line_hours,
+    complete_terms, catalog_total_hours
+)
+from quote_suggestions import load_suggestions, get_suggestions
+from calibrate_srt_hours import load_hours_overlay
+from rerun_profiler import start_profile, finish_profile
+from export_jobs import new_export_queue, submit_export, excel_workbook, zipped_csvs
+from quote_line_cache import new_line_cache, cached_quote_line
+from quote_variants import (
+    new_workspace, variant_items, variant_lines, add_lines, remove_line, clear_variant,
+    create_variant, delete_variant, compare_variants
+)
+from quote_pricing import (
+    DEFAULT_LABOR_RATE, DIFFICULTY_FACTORS, build_multiplier_tensor, sweep_quote, scenario_rank,
+    BRANCH_LABOR_RATES, TECH_CLASSES, tech_class_for_location, rate_table, price_rate_grid
+)
 
 # ============================================================================
 # CONFIGURATION
@@ -23,8 +44,14 @@ COMPANY_COLORS = {
     'background': '#f5f5f5'
 }
 
-# Default Settings
-DEFAULT_LABOR_RATE = 125.00
+# Rerun profiles kept per session when profiling is on (?profile=1 or Admin toggle)
+PROFILE_HISTORY = 10
+
+# Background export jobs kept per session (the per-process cap is in export_jobs.py)
+EXPORT_JOB_HISTORY = 5
+
+# Default Settings (DEFAULT_LABOR_RATE and DIFFICULTY_FACTORS live in
+# quote_pricing.py so the API service prices with the same matrix)
 CURRENCY_SYMBOL = "$"
 
 # Supported Manufacturers
@@ -42,58 +69,6 @@ MANUFACTURERS = [
     "Other"
 ]
 
-# Enhanced Difficulty Matrix
-DIFFICULTY_FACTORS = {
-    'age': {
-        "0-2 years (New)": 1.0,
-        "3-5 years (Like New)": 1.05,
-        "6-8 years (Good)": 1.15,
-        "9-12 years (Average)": 1.25,
-        "13-15 years (Older)": 1.35,
-        "16-20 years (Old)": 1.50,
-        "20+ years (Very Old)": 1.75
-    },
-    'condition': {
-        "Excellent - Well maintained": 1.0,
-        "Good - Normal wear": 1.10,
-        "Fair - Some issues": 1.25,
-        "Poor - Multiple problems": 1.40,
-        "Severe - Major overhaul needed": 1.60
-    },
-    'location': {
-        "Shop - Full facilities": 1.0,
-        "On-site - Accessible": 1.15,
-        "On-site - Limited access": 1.30,
-        "Remote - Difficult terrain": 1.50,
-        "Remote - Extreme conditions": 1.75
-    },
-    'manufacturer': {
-        "CNH (Case/New Holland)": 1.0,  # Your specialty
-        "Caterpillar": 1.05,
-        "John Deere": 1.05,
-        "Komatsu": 1.10,
-        "Volvo": 1.10,
-        "Hitachi": 1.15,
-        "Liebherr": 1.15,
-        "JCB": 1.08,
-        "Doosan": 1.12,
-        "Kubota": 1.05,
-        "Other": 1.20
-    },
-    'urgency': {
-        "Standard - Normal schedule": 1.0,
-        "Priority - Within 3 days": 1.20,
-        "Rush - Next day": 1.50,
-        "Emergency - Same day": 2.00
-    },
-    'complexity': {
-        "Routine - Standard service": 1.0,
-        "Moderate - Some diagnosis needed": 1.15,
-        "Complex - Extensive troubleshooting": 1.30,
-        "Severe - Complete tear-down": 1.50
-    }
-}
-
 # ============================================================================
 # PAGE CONFIGURATION
 # ============================================================================
@@ -105,6 +80,31 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ============================================================================
+# PROFILING
+# ============================================================================
+
+def finish_session_profile():
+    """Close this session's open rerun profile, if any, into its ring buffer"""
+    handle = st.session_state.pop('active_profile', None)
+    if handle is not None:
+        st.session_state.profiles.append(finish_profile(handle))
+
+if 'profiles' not in st.session_state:
+    st.session_state.profiles = deque(maxlen=PROFILE_HISTORY)
+
+# A rerun cut short by st.rerun()/st.stop() never reached the end of the script
+finish_session_profile()
+
+profiling_enabled = st.query_params.get('profile') == '1' or st.session_state.get('profile_session', False)
+profile_blocked = False
+if profiling_enabled:
+    active_profile = start_profile()
+    if active_profile is not None:
+        st.session_state.active_profile = active_profile
+    else:
+        profile_blocked = True
+
 # Custom CSS for professional appearance
 st.markdown(f"""
 <style>
@@ -214,27 +214,20 @@ st.markdown(f"""
 # LOAD DATABASE
 # ============================================================================
 
-@st.cache_data
+@st.cache_resource
 def load_database():
-    """Load SRT database using the new loader"""
+    """
+    Load SRT database using the new loader and build the shared catalog.
+    Returns (catalog, validation report state; None if the snapshot has none).
+    """
     try:
-        df, models = load_srt_database()
-        
-        # Convert back to the old format for compatibility
-        # (grouped by model_key with list of codes)
-        database = {}
-        for model_key in df['model_key'].unique():
-            model_data = df[df['model_key'] == model_key]
-            database[model_key] = [
-                {
-                    'code': row['code'],
-                    'description': row['description'],
-                    'hours': row['hours']
-                }
-                for _, row in model_data.iterrows()
-            ]
-        
-        return database, models, df
+        # Prefer the snapshot compiled by `python load_srt_database.py build`,
+        # which carries the validation report made at build time; otherwise
+        # the loaded table is validated without holding up the first render.
+        # Per-model groups ({model_key: [codes]}, the old format) and search
+        # indexes live in the catalog, which is shared across sessions so that
+        # delta files can be applied to it in place
+        return load_catalog(validate=True)
     except FileNotFoundError as e:
         st.error(f"❌ {str(e)}")
         st.error("Please make sure 'srt_database_organized.json' and 'load_srt_database.py' are in your repository.")
@@ -243,18 +236,66 @@ def load_database():
         st.error(f"❌ Error loading database: {e}")
         st.stop()
 
+@st.cache_resource
+def load_quote_suggestions():
+    """'Frequently quoted together' table built offline by quote_suggestions.py"""
+    return load_suggestions()
+
+@st.cache_resource
+def load_calibrated_hours():
+    """Calibrated-hours overlay built offline by calibrate_srt_hours.py"""
+    return load_hours_overlay()
+
+@st.cache_resource
+def load_line_cache():
+    """Resolved fields and markdown per quote line, shared by every session in the process"""
+    return new_line_cache()
+
+@st.cache_resource
+def load_export_queue():
+    """Thread pool for large exports, shared by every session in the process"""
+    return new_export_queue()
+
+@st.cache_resource
+def load_multiplier_tensor():
+    """Combined multiplier for every difficulty scenario, computed once per process"""
+    return build_multiplier_tensor(DIFFICULTY_FACTORS)
+
 # Load database
-database, model_metadata, df_all = load_database()
+catalog, validation = load_database()
+
+# Pick up any new SRT revisions without a full reload (each file is read once;
+# a rejected file is reported to the session that found it and then skipped)
+applied_deltas, rejected_deltas = apply_pending_deltas(catalog)
+for delta_summary in applied_deltas:
+    st.toast(
+        f"Applied SRT update v{delta_summary['version']}: "
+        f"{delta_summary['upserted_codes']} codes changed, {delta_summary['removed_codes']} removed, "
+        f"{delta_summary['added_models']} models added, {delta_summary['removed_models']} removed"
+    )
+for delta_file, reason in rejected_deltas.items():
+    st.warning(f"⚠️ Skipped SRT update {delta_file}: {reason}")
+
+database = catalog['database']
+model_metadata = catalog['model_lookup']
 
 # Success message
-st.success(f"✅ Loaded {len(database)} models with {len(df_all):,} SRT codes")
+st.success(f"✅ Loaded {len(database)} models with {catalog_num_codes(catalog):,} SRT codes (catalog v{catalog['version']})")
 
 # ============================================================================
 # SESSION STATE INITIALIZATION
 # ============================================================================
 
-if 'quote_items' not in st.session_state:
-    st.session_state.quote_items = []
+# Quote lines are compact QuoteLine references into the shared catalog (display
+# fields are resolved at render time), held in named variants that share one
+# line store (see quote_variants.py)
+if 'quote_workspace' not in st.session_state:
+    st.session_state.quote_workspace = new_workspace()
+workspace = st.session_state.quote_workspace
+
+# Background export jobs (dicts updated by export_jobs' worker threads), newest first
+if 'export_jobs' not in st.session_state:
+    st.session_state.export_jobs = []
 
 if 'difficulty_factors' not in st.session_state:
     st.session_state.difficulty_factors = {
@@ -266,6 +307,52 @@ if 'difficulty_factors' not in st.session_state:
         'complexity': 1.0
     }
 
+def quote_summary_html(operations: int, base_hours: float, multiplier: float) -> str:
+    """Quick Summary metric cards"""
+    return f"""
+    <div class="metric-card">
+        <p class="metric-value">{operations}</p>
+        <p class="metric-label">Operations</p>
+    </div>
+    <div class="metric-card">
+        <p class="metric-value">{base_hours:.1f}</p>
+        <p class="metric-label">Base Hours</p>
+    </div>
+    <div class="metric-card">
+        <p class="metric-value">{base_hours * multiplier:.1f}</p>
+        <p class="metric-label">Adjusted Hours</p>
+    </div>
+    <div class="metric-card">
+        <p class="metric-value">{multiplier:.2f}x</p>
+        <p class="metric-label">Total Multiplier</p>
+    </div>
+    """
+
+def complete_search_term(term: str):
+    """Replace the word being typed in the search box with the chosen completion"""
+    words = st.session_state.search_term.split()
+    st.session_state.search_term = ' '.join(words[:-1] + [term]) + ' '
+
+def show_export_jobs(polling: bool):
+    """Progress of this session's export jobs, with downloads for finished ones"""
+    for job in st.session_state.export_jobs:
+        if job['status'] == 'done':
+            st.download_button(
+                label=f"📥 {job['name']} ({len(job['data']) / 1024:,.0f} KB, built in {job['seconds']:.1f}s)",
+                data=job['data'],
+                file_name=job['file_name'],
+                mime=job['mime'],
+                key=f"export_job_{job['id']}"
+            )
+        elif job['status'] == 'failed':
+            st.error(f"❌ {job['name']} failed: {job['error']}")
+        else:
+            st.progress(job['progress'], text=f"{job['name']}: {job['message']}")
+    
+    # Stop polling once every job has finished
+    if polling and not any(job['status'] in ('queued', 'running') for job in st.session_state.export_jobs):
+        st.rerun()
+
 # ============================================================================
 # HEADER
 # ============================================================================
@@ -295,20 +382,16 @@ with st.sidebar:
     if manufacturer == "CNH (Case/New Holland)":
         st.markdown("### CNH Models Available")
         
-        # Group models by equipment type
-        models_by_type = get_models_by_type(model_metadata)
-        
-        # Equipment type selector
-        equipment_types = sorted(models_by_type.keys())
+        # Equipment type selector (types are grouped and sorted at load time)
         selected_type = st.selectbox(
             "Equipment Type",
-            options=equipment_types,
+            options=catalog['equipment_types'],
+            format_func=lambda eq_type: f"{eq_type} ({catalog['type_counts'][eq_type]:,} ops)",
             help="Filter by equipment category"
         )
         
         # Model selector (filtered by type)
-        available_models = models_by_type[selected_type]
-        model_display_names = [model_metadata[mk]['display_name'] for mk in available_models]
+        model_display_names = catalog['display_names_by_type'][selected_type]
         
         selected_display = st.selectbox(
             "Model",
@@ -317,36 +400,165 @@ with st.sidebar:
         )
         
         # Get the actual model key
-        selected_model_key = available_models[model_display_names.index(selected_display)]
+        selected_model_key = catalog['model_key_by_display'][selected_display]
         
-        # Show model info
-        st.info(f"📊 {len(database[selected_model_key])} operations available")
+        # Show model info (statistics precomputed with the catalog)
+        model_stats = catalog['model_stats'][selected_model_key]
+        st.info(f"📊 {model_stats['operations']} operations available · {model_stats['total_hours']:,.1f} book hours")
+        
+        with st.expander("📈 Model Statistics"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Median Hours", f"{model_stats['percentiles'][50]:.1f}")
+                st.metric("Mean Hours", f"{model_stats['mean_hours']:.1f}")
+            with col2:
+                st.metric("P90 Hours", f"{model_stats['percentiles'][90]:.1f}")
+                st.metric("Code Sections", len(model_stats['sections']))
+            st.caption(
+                f"Hours range {model_stats['min_hours']:.1f}–{model_stats['max_hours']:.1f} · "
+                f"P25 {model_stats['percentiles'][25]:.1f} · P75 {model_stats['percentiles'][75]:.1f}"
+            )
+            st.dataframe(
+                pd.DataFrame(list(model_stats['sections'].items()), columns=["Section", "Operations"]),
+                use_container_width=True,
+                hide_index=True
+            )
         
         # Get operations for selected model
         available_operations = database[selected_model_key]
         
+        # Service kits (resolved and totalled when the catalog is built)
+        model_kits = catalog['kits'].get(selected_model_key, [])
+        if model_kits:
+            st.markdown("---")
+            st.markdown("### 🧰 Service Kits")
+            
+            for kit_idx, kit in enumerate(model_kits):
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.markdown(f"**{kit['name']}**  \n{len(kit['operations'])} operations · {kit['base_hours']:.1f} hours")
+                    if kit['missing_codes']:
+                        st.caption(f"Not in catalog: {', '.join(kit['missing_codes'])}")
+                
+                with col2:
+                    if st.button("Add", key=f"add_kit_{kit_idx}", use_container_width=True):
+                        existing_codes = {line.code for line in variant_lines(workspace)}
+                        add_lines(workspace, (
+                            QuoteLine(selected_model_key, op['code'])
+                            for op in kit['operations']
+                            if op['code'] not in existing_codes
+                        ))
+                        st.rerun()
+        
         # Search/filter operations
         st.markdown("---")
         st.markdown("### 🔍 Find Operations")
         
         search_term = st.text_input(
             "Search operations",
+            key="search_term",
             placeholder="e.g., engine, hydraulic, replace...",
-            help="Filter by description or code"
+            help="Every word must match the start of a description word or code segment"
         )
         
-        # Filter operations based on search
-        if search_term:
-            filtered_ops = [
-                op for op in available_operations
-                if search_term.lower() in op['description'].lower() or 
-                   search_term.lower() in op['code'].lower()
+        # Complete the word being typed from the model's term dictionary
+        typed_words = search_term.split()
+        if typed_words and not search_term[-1].isspace():
+            completions = [
+                (term, doc_freq) for term, doc_freq in complete_terms(catalog, selected_model_key, typed_words[-1])
+                if term != typed_words[-1].lower()
             ]
-        else:
-            filtered_ops = available_operations
+            if completions:
+                completion_cols = st.columns(2)
+                for i, (term, doc_freq) in enumerate(completions):
+                    completion_cols[i % 2].button(
+                        f"{term} ({doc_freq})",
+                        key=f"complete_{term}",
+                        on_click=complete_search_term,
+                        args=(term,),
+                        use_container_width=True
+                    )
+        
+        # Hours-range and code-section filters (answered from precomputed indexes)
+        hours_range = None
+        min_hours, max_hours = get_hours_bounds(catalog, selected_model_key)
+        if min_hours < max_hours:
+            selected_range = st.slider(
+                "Labor hours",
+                min_value=min_hours,
+                max_value=max_hours,
+                value=(min_hours, max_hours),
+                step=0.1,
+                help="Only show operations within this labor-hour range"
+            )
+            if selected_range != (min_hours, max_hours):
+                hours_range = selected_range
+        
+        section_counts = get_section_counts(catalog, selected_model_key)
+        selected_section = st.selectbox(
+            "Code section",
+            options=["All sections"] + list(section_counts),
+            format_func=lambda section: section if section == "All sections" else f"{section} ({section_counts[section]} ops)",
+            help="Filter by the first segment of the SRT code"
+        )
+        
+        # Filter operations based on search (through the model's indexes)
+        filtered_ops = search_model_operations(
+            catalog, selected_model_key, search_term,
+            hours_range=hours_range,
+            section=None if selected_section == "All sections" else selected_section
+        )
         
         st.caption(f"Showing {len(filtered_ops)} of {len(available_operations)} operations")
         
+        # Bulk add from a pasted work-order code list
+        with st.expander("📋 Bulk Add Codes"):
+            with st.form("bulk_add"):
+                pasted_codes = st.text_area(
+                    "SRT codes",
+                    placeholder="One code per line, or separated by commas",
+                    help="Paste codes from a work order to add them all at once"
+                )
+                
+                if st.form_submit_button("Add All to Quote"):
+                    matched_ops, unknown_codes = resolve_codes(
+                        catalog, selected_model_key, parse_code_list(pasted_codes)
+                    )
+                    
+                    existing_codes = {line.code for line in variant_lines(workspace)}
+                    new_ops = [op for op in matched_ops if op['code'] not in existing_codes]
+                    add_lines(workspace, (QuoteLine(selected_model_key, op['code']) for op in new_ops))
+                    
+                    if new_ops:
+                        st.success(f"Added {len(new_ops)} operations")
+                    if len(new_ops) < len(matched_ops):
+                        st.info(f"{len(matched_ops) - len(new_ops)} already in quote")
+                    if unknown_codes:
+                        st.warning(f"Unknown codes for {selected_display}: {', '.join(unknown_codes)}")
+        
+        # Suggestions for the last operation added on this model
+        last_added = st.session_state.get('last_added')
+        if last_added is not None and last_added.model_key == selected_model_key:
+            existing_codes = {line.code for line in variant_lines(workspace)}
+            model_codes = catalog['codes'][selected_model_key]
+            suggested_codes = [
+                code for code in get_suggestions(load_quote_suggestions(), selected_model_key, last_added.code)
+                if code in model_codes and code not in existing_codes
+            ]
+            
+            if suggested_codes:
+                st.markdown("---")
+                st.markdown(f"### 💡 Often Quoted With {last_added.code}")
+                for code in suggested_codes:
+                    col1, col2 = st.columns([3, 1])
+                    with col1:
+                        st.markdown(f"**{code}** · {model_codes[code]['hours']:.1f} hrs  \n<small>{model_codes[code]['preview']}</small>", unsafe_allow_html=True)
+                    with col2:
+                        if st.button("Add", key=f"suggest_{code}", use_container_width=True):
+                            add_lines(workspace, [QuoteLine(selected_model_key, code)])
+                            st.rerun()
+        
         # Display operations and add to quote
         st.markdown("---")
         st.markdown("### ➕ Add to Quote")
@@ -361,24 +573,20 @@ with st.sidebar:
                         st.markdown(f"""
                         <div class="operation-card">
                             <span class="operation-code">{op['code']}</span><br/>
-                            <small>{op['description'][:80]}...</small><br/>
+                            <small>{op['preview']}{'...' if op['description_ref'] is not None else ''}</small><br/>
                             <strong>{op['hours']:.1f} hours</strong>
                         </div>
                         """, unsafe_allow_html=True)
                     
                     with col2:
                         if st.button("Add", key=f"add_{op['code']}", use_container_width=True):
-                            # Add to quote
-                            quote_item = {
-                                'code': op['code'],
-                                'description': op['description'],
-                                'hours': op['hours'],
-                                'model': selected_display
-                            }
+                            # Add to quote (a reference; fields are resolved from the catalog)
+                            quote_item = QuoteLine(selected_model_key, op['code'])
                             
                             # Check if already added
-                            if not any(item['code'] == op['code'] for item in st.session_state.quote_items):
-                                st.session_state.quote_items.append(quote_item)
+                            if not any(line.code == op['code'] for line in variant_lines(workspace)):
+                                add_lines(workspace, [quote_item])
+                                st.session_state.last_added = quote_item
                                 st.success(f"Added {op['code']}")
                                 st.rerun()
                             else:
@@ -401,51 +609,149 @@ with st.sidebar:
             
             if st.form_submit_button("Add to Quote"):
                 if manual_code and manual_desc:
-                    quote_item = {
-                        'code': manual_code,
+                    quote_item = QuoteLine(None, manual_code, {
                         'description': manual_desc,
                         'hours': manual_hours,
                         'model': f"{manufacturer} (Manual Entry)"
-                    }
-                    st.session_state.quote_items.append(quote_item)
+                    })
+                    add_lines(workspace, [quote_item])
                     st.success("Added to quote!")
                     st.rerun()
                 else:
                     st.error("Please fill in all fields")
+    
+    # Database stats, with the background validation report once it is ready
+    st.markdown("---")
+    st.markdown("### 📊 Database Stats")
+    st.metric("Models Available", len(database))
+    st.metric("Total Operations", f"{catalog_num_codes(catalog):,}")
+    st.metric("Total Book Hours", f"{catalog_total_hours(catalog):,.0f}")
+    if manufacturer == "CNH (Case/New Holland)":
+        st.metric(
+            f"{selected_display} Hours",
+            f"{model_stats['total_hours']:,.1f}",
+            delta=f"median {model_stats['percentiles'][50]:.1f} h/op",
+            delta_color="off"
+        )
+    
+    if validation is None:
+        st.caption("Validation report not in this catalog snapshot; rebuild it to include one")
+    elif not validation['done'].is_set():
+        st.caption("🔎 Checking catalog data in the background...")
+    elif validation['error']:
+        st.caption(f"⚠️ Catalog validation failed: {validation['error']}")
+    elif validation['summary']:
+        st.warning(f"⚠️ {len(validation['report']):,} data issues in {validation['rows']:,} SRT rows")
+        for issue, count in validation['summary'].items():
+            st.caption(f"{issue}: {count:,}")
+        st.download_button(
+            "📥 Download Validation Report",
+            data=validation['csv'],
+            file_name="srt_validation_report.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+    else:
+        st.caption(f"✓ {validation['rows']:,} SRT rows passed validation ({validation['seconds']:.1f}s)")
+    
+    # Admin tools
+    with st.expander("🛠️ Admin"):
+        st.toggle(
+            "Profile this session",
+            key="profile_session",
+            help="Capture a cProfile of every rerun (also enabled with ?profile=1 in the URL)"
+        )
 
 # ============================================================================
 # MAIN CONTENT AREA
 # ============================================================================
 
+# Optionally price with hours calibrated from work-order history
+hours_overlay = load_calibrated_hours()
+use_calibrated_hours = bool(hours_overlay) and st.toggle(
+    "Use calibrated hours",
+    help="Replace SRT book hours with hours calibrated from actual work orders, where available"
+)
+
+# Display fields and HTML for the active variant's lines come from the shared
+# line cache; the session itself only holds the compact QuoteLines
+content_version = (catalog['version'], use_calibrated_hours)
+active_items = variant_items(workspace)
+rendered_lines = [
+    cached_quote_line(load_line_cache(), catalog, line, content_version,
+                      hours_overlay if use_calibrated_hours else None)
+    for _, line in active_items
+]
+
+quote_items = [line for _, line in active_items]
+quote_lines = [item for item, _ in rendered_lines]
+
 # Create tabs
 tab1, tab2, tab3 = st.tabs(["📝 Quote Builder", "⚙️ Difficulty Factors", "📄 Review & Export"])
 
 # TAB 1: QUOTE BUILDER
 with tab1:
+    # Quote variants (e.g. repair vs overhaul) for the same machine
+    variant_names = list(workspace['variants'])
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 1, 1, 1], vertical_alignment="bottom")
+    
+    with col1:
+        selected_variant = st.selectbox(
+            "Quote variant",
+            options=variant_names,
+            index=variant_names.index(workspace['active']),
+            help="Alternatives for the same machine share lines until one is edited"
+        )
+        if selected_variant != workspace['active']:
+            workspace['active'] = selected_variant
+            st.rerun()
+    
+    with col2:
+        new_variant_name = st.text_input("New variant name", placeholder="e.g., Overhaul")
+    
+    with col3:
+        clone_clicked = st.button("Clone", key="clone_variant", use_container_width=True,
+                                  help="Copy the current variant's lines into a new variant")
+    with col4:
+        new_clicked = st.button("New", key="new_variant", use_container_width=True,
+                                help="Start an empty variant")
+    with col5:
+        delete_clicked = st.button("Delete", key="delete_variant", use_container_width=True,
+                                   disabled=len(variant_names) == 1, help="Delete the current variant")
+    
+    try:
+        if clone_clicked or new_clicked:
+            if not new_variant_name.strip():
+                st.error("Enter a name for the new variant")
+            else:
+                create_variant(workspace, new_variant_name.strip(), workspace['active'] if clone_clicked else None)
+                st.rerun()
+        if delete_clicked:
+            delete_variant(workspace, workspace['active'])
+            st.rerun()
+    except ValueError as e:
+        st.error(str(e))
+    
     st.markdown("### 🛠️ Current Quote")
     
-    if not st.session_state.quote_items:
+    if not quote_items:
         st.info("👈 Select operations from the sidebar to build your quote")
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
         # Display quote items
-        if st.session_state.quote_items:
-            for idx, item in enumerate(st.session_state.quote_items):
+        if quote_items:
+            for idx, ((line_id, _), (_, line_html)) in enumerate(zip(active_items, rendered_lines)):
                 with st.container():
                     col_a, col_b = st.columns([4, 1])
                     
                     with col_a:
-                        st.markdown(f"""
-                        **{item['code']}** - {item['hours']:.1f} hrs  
-                        {item['description']}  
-                        <small>Model: {item['model']}</small>
-                        """, unsafe_allow_html=True)
+                        st.markdown(line_html, unsafe_allow_html=True)
                     
                     with col_b:
-                        if st.button("🗑️", key=f"remove_{idx}", help="Remove"):
-                            st.session_state.quote_items.pop(idx)
+                        if st.button("🗑️", key=f"remove_{line_id}", help="Remove"):
+                            remove_line(workspace, idx)
                             st.rerun()
                 
                 st.markdown("---")
@@ -453,34 +759,21 @@ with tab1:
     with col2:
         st.markdown("### Quick Summary")
         
-        if st.session_state.quote_items:
-            base_hours = sum(item['hours'] for item in st.session_state.quote_items)
-            
+        if quote_items:
             # Calculate total multiplier
             total_multiplier = 1.0
             for factor_value in st.session_state.difficulty_factors.values():
                 total_multiplier *= factor_value
             
-            adjusted_hours = base_hours * total_multiplier
+            # Rebuilt only when the lines, their content or the multiplier change
+            summary_key = (workspace['variants'][workspace['active']], content_version, total_multiplier)
+            cached_summary = st.session_state.get('summary_html')
+            if cached_summary is None or cached_summary[0] != summary_key:
+                base_hours = sum(item['hours'] for item in quote_lines)
+                cached_summary = (summary_key, quote_summary_html(len(quote_items), base_hours, total_multiplier))
+                st.session_state.summary_html = cached_summary
             
-            st.markdown(f"""
-            <div class="metric-card">
-                <p class="metric-value">{len(st.session_state.quote_items)}</p>
-                <p class="metric-label">Operations</p>
-            </div>
-            <div class="metric-card">
-                <p class="metric-value">{base_hours:.1f}</p>
-                <p class="metric-label">Base Hours</p>
-            </div>
-            <div class="metric-card">
-                <p class="metric-value">{adjusted_hours:.1f}</p>
-                <p class="metric-label">Adjusted Hours</p>
-            </div>
-            <div class="metric-card">
-                <p class="metric-value">{total_multiplier:.2f}x</p>
-                <p class="metric-label">Total Multiplier</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(cached_summary[1], unsafe_allow_html=True)
 
 # TAB 2: DIFFICULTY FACTORS
 with tab2:
@@ -565,17 +858,45 @@ with tab2:
         st.metric("Total Multiplier", f"{total_mult:.2f}x", 
                  delta=f"+{(total_mult - 1.0) * 100:.0f}%" if total_mult > 1.0 else "Standard")
     with col3:
-        if st.session_state.quote_items:
-            base = sum(item['hours'] for item in st.session_state.quote_items)
+        if quote_items:
+            base = sum(item['hours'] for item in quote_lines)
             st.metric("Impact on Current Quote", 
                      f"+{(base * total_mult - base):.1f} hours",
                      delta=f"{base:.1f}h → {base * total_mult:.1f}h")
+    
+    # What-if sweep across every combination of difficulty factors
+    if quote_items:
+        st.markdown("---")
+        st.markdown("### 🎲 Scenario Sweep")
+        
+        multiplier_tensor = load_multiplier_tensor()
+        sweep = sweep_quote(base, DEFAULT_LABOR_RATE, multiplier_tensor)
+        st.markdown(
+            f"Current quote priced across all {sweep['scenarios']:,} difficulty scenarios "
+            f"at {CURRENCY_SYMBOL}{DEFAULT_LABOR_RATE:.2f}/hour"
+        )
+        
+        percentile_cols = st.columns(len(sweep['percentiles']))
+        for col, (pct, cost) in zip(percentile_cols, sweep['percentiles'].items()):
+            with col:
+                st.metric(f"P{pct}", f"{CURRENCY_SYMBOL}{cost:,.0f}")
+        
+        counts, edges = np.histogram(sweep['costs'], bins=30)
+        st.bar_chart(
+            pd.DataFrame({'Scenarios': counts}, index=[f"{CURRENCY_SYMBOL}{edge:,.0f}" for edge in edges[:-1]]),
+            x_label="Quote total",
+            y_label="Scenarios"
+        )
+        st.caption(
+            f"Range {CURRENCY_SYMBOL}{sweep['min_cost']:,.0f} – {CURRENCY_SYMBOL}{sweep['max_cost']:,.0f}; "
+            f"the current selection is at the {scenario_rank(multiplier_tensor, total_mult):.0f}th percentile"
+        )
 
 # TAB 3: REVIEW & EXPORT
 with tab3:
     st.markdown("### 📄 Quote Review & Export")
     
-    if not st.session_state.quote_items:
+    if not quote_items:
         st.warning("⚠️ No operations added yet. Add operations from the sidebar to create a quote.")
     else:
         # Customer Information
@@ -590,17 +911,20 @@ with tab3:
         with col2:
             st.markdown("#### Equipment & Pricing")
             equipment_serial = st.text_input("Equipment Serial #", placeholder="ABC123456")
+            branch = st.selectbox("Branch", options=list(BRANCH_LABOR_RATES))
+            tech_class = tech_class_for_location(location_selection)
             labor_rate = st.number_input(
                 "Labor Rate ($/hour)",
                 min_value=0.0,
-                value=DEFAULT_LABOR_RATE,
+                value=BRANCH_LABOR_RATES[branch][tech_class],
                 step=5.0,
-                format="%.2f"
+                format="%.2f",
+                help=f"{branch} {tech_class.lower()} technician rate (tech class follows the work location)"
             )
             quote_date = st.date_input("Quote Date", value=datetime.now())
         
         # Calculate totals
-        base_hours = sum(item['hours'] for item in st.session_state.quote_items)
+        base_hours = sum(item['hours'] for item in quote_lines)
         total_multiplier = 1.0
         for factor_value in st.session_state.difficulty_factors.values():
             total_multiplier *= factor_value
@@ -621,13 +945,53 @@ with tab3:
         with col4:
             st.metric("Total Cost", f"{CURRENCY_SYMBOL}{total_cost:,.2f}")
         
+        # Side-by-side totals for every variant (shared lines are resolved once)
+        if len(workspace['variants']) > 1:
+            st.markdown("---")
+            st.markdown("### ⚖️ Variant Comparison")
+            
+            comparison = compare_variants(
+                workspace,
+                lambda line: quote_line_hours(catalog, line, hours_overlay if use_calibrated_hours else None)
+            )
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Variant': f"{name} (current)" if name == workspace['active'] else name,
+                        'Operations': totals['lines'],
+                        'Base Hours': round(totals['base_hours'], 1),
+                        'Adj. Hours': round(totals['base_hours'] * total_multiplier, 1),
+                        'Cost': f"{CURRENCY_SYMBOL}{totals['base_hours'] * total_multiplier * labor_rate:,.2f}"
+                    }
+                    for name, totals in comparison.items()
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        # Every branch and tech class priced in one broadcast
+        st.markdown("---")
+        st.markdown("### 🏢 Branch Rate Comparison")
+        
+        branches, rates = rate_table()
+        rate_totals = price_rate_grid([item['hours'] for item in quote_lines], total_multiplier, rates).sum(axis=0)
+        st.dataframe(
+            pd.DataFrame(rate_totals, index=branches, columns=[f"{tech} Tech" for tech in TECH_CLASSES]),
+            use_container_width=True,
+            column_config={
+                f"{tech} Tech": st.column_config.NumberColumn(format=f"{CURRENCY_SYMBOL}%.2f")
+                for tech in TECH_CLASSES
+            }
+        )
+        st.caption(f"{location_selection.split(' - ')[0]} work is priced at the {tech_class.lower()} technician rate")
+        
         # Detailed breakdown
         st.markdown("---")
         st.markdown("### 📋 Detailed Breakdown")
         
         # Create DataFrame
         quote_data = []
-        for item in st.session_state.quote_items:
+        for item in quote_lines:
             adjusted_item_hours = item['hours'] * total_multiplier
             item_cost = adjusted_item_hours * labor_rate
             
@@ -672,8 +1036,94 @@ with tab3:
         
         with col3:
             if st.button("🗑️ Clear Quote", type="secondary"):
-                st.session_state.quote_items = []
+                clear_variant(workspace)
                 st.rerun()
+        
+        # Multi-sheet and multi-file exports build on the background export pool
+        # so the session stays responsive while they run
+        st.markdown("---")
+        st.markdown("### 📦 Fleet Exports")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            fleet_workbook = st.button("📊 Fleet Workbook (Excel)", help="Summary sheet plus one sheet per machine")
+        with col2:
+            machine_files = st.button("🗜️ Per-Machine Files (ZIP)", help="One CSV per machine, zipped together")
+        
+        if fleet_workbook or machine_files:
+            export_lines = pd.DataFrame([
+                {
+                    'SRT Code': item['code'],
+                    'Description': item['description'],
+                    'Model': item['model'],
+                    'Base Hours': round(item['hours'], 2),
+                    'Adj. Hours': round(item['hours'] * total_multiplier, 2),
+                    'Cost': round(item['hours'] * total_multiplier * labor_rate, 2)
+                }
+                for item in quote_lines
+            ])
+            machines = dict(tuple(export_lines.groupby('Model', sort=False)))
+            export_name = f"quote_{customer_name.replace(' ', '_')}_{quote_date}"
+            
+            if fleet_workbook:
+                summary = export_lines.groupby('Model', sort=False).agg(
+                    **{'Operations': ('SRT Code', 'size'), 'Base Hours': ('Base Hours', 'sum'),
+                       'Adj. Hours': ('Adj. Hours', 'sum'), 'Cost': ('Cost', 'sum')}
+                ).round(2).reset_index()
+                export = ("Fleet workbook", f"{export_name}_fleet.xlsx",
+                          "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                          excel_workbook({'Summary': summary, **machines}))
+            else:
+                export = ("Per-machine files", f"{export_name}_machines.zip", "application/zip",
+                          zipped_csvs({
+                              ''.join(c if c.isalnum() or c in '-_.' else '_' for c in model) + '.csv': lines
+                              for model, lines in machines.items()
+                          }))
+            
+            try:
+                job = submit_export(load_export_queue(), *export)
+                st.session_state.export_jobs = [job] + st.session_state.export_jobs[:EXPORT_JOB_HISTORY - 1]
+            except RuntimeError as e:
+                st.warning(f"⚠️ {e}")
+    
+    # Jobs stay listed (and downloadable) after the quote changes or is cleared
+    if st.session_state.export_jobs:
+        polling = any(job['status'] in ('queued', 'running') for job in st.session_state.export_jobs)
+        st.fragment(show_export_jobs, run_every=1.0 if polling else None)(polling)
+
+# ============================================================================
+# RERUN PROFILES
+# ============================================================================
+
+if profiling_enabled or st.session_state.profiles:
+    profiles = list(reversed(st.session_state.profiles))
+    with st.expander(f"🔬 Rerun Profiles ({len(profiles)} of last {PROFILE_HISTORY})"):
+        if profile_blocked:
+            st.warning("⚠️ Another session is being profiled; this rerun was not captured")
+        if not profiles:
+            st.caption("Profiles appear here once a profiled rerun finishes.")
+        else:
+            profile_idx = st.selectbox(
+                "Rerun",
+                options=range(len(profiles)),
+                format_func=lambda i: f"{profiles[i]['started_at']:%H:%M:%S} · {profiles[i]['seconds'] * 1000:,.0f} ms"
+            )
+            profile = profiles[profile_idx]
+            st.dataframe(
+                profile['top'],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'own_s': st.column_config.NumberColumn("Own (s)", format="%.4f"),
+                    'cumulative_s': st.column_config.NumberColumn("Cumulative (s)", format="%.4f")
+                }
+            )
+            st.download_button(
+                label="📥 Download .pstats",
+                data=profile['pstats'],
+                file_name=f"rerun_{profile['started_at']:%Y%m%d_%H%M%S}.pstats",
+                mime="application/octet-stream"
+            )
 
 # ============================================================================
 # FOOTER
@@ -685,3 +1135,6 @@ st.markdown("""
     <p><small>Professional Service Quote Tool v2.0 | Multi-Manufacturer Support</small></p>
 </div>
 """, unsafe_allow_html=True)
+
+# Close this rerun's profile
+finish_session_profile()